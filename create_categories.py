@@ -10,6 +10,8 @@ import django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'stationery_tracker.settings')
 django.setup()
 
+from django.conf import settings
+from django.db import transaction
 from tracker.models import Category
 
 def create_default_categories():
@@ -27,17 +29,21 @@ def create_default_categories():
         {'name': 'Labels & Stickers', 'description': 'Address labels, decorative stickers, name tags'},
     ]
     
-    created_count = 0
+    names = [c['name'] for c in categories]
+    with transaction.atomic():
+        existing = set(Category.objects.filter(name__in=names).values_list('name', flat=True))
+        to_create = [
+            Category(name=c['name'], description=c['description'])
+            for c in categories if c['name'] not in existing
+        ]
+        Category.objects.bulk_create(to_create, ignore_conflicts=True, batch_size=settings.BULK_BATCH_SIZE)
+
     for category_data in categories:
-        category, created = Category.objects.get_or_create(
-            name=category_data['name'],
-            defaults={'description': category_data['description']}
-        )
-        if created:
-            print(f"✓ Created category: {category.name}")
-            created_count += 1
+        if category_data['name'] in existing:
+            print(f"- Category already exists: {category_data['name']}")
         else:
-            print(f"- Category already exists: {category.name}")
+            print(f"✓ Created category: {category_data['name']}")
+    created_count = len(to_create)
     
     print(f"\nTotal categories created: {created_count}")
     print("You can now add stationery items with these categories!")
@@ -71,8 +71,29 @@ DATABASES = {
 }
 
 
-
-
+# Batch size for bulk_create/bulk_update and large id__in updates.
+# Smaller batches mean more round-trips but bounded memory and statement size;
+# larger batches mean fewer round-trips but bigger transactions and SQL packets.
+BULK_BATCH_SIZE = int(os.getenv('BULK_BATCH_SIZE', '500'))
+
+# Cache. tracker/caching.py invalidates by bumping or deleting keys, which only
+# reaches other worker processes through a shared backend: production deployments
+# running more than one worker must set REDIS_URL. Without it each process gets its
+# own LocMemCache, which is only suitable for development or a single worker.
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
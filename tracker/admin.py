@@ -2,6 +2,7 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.contrib import messages
 from django.utils import timezone
+from django.db.models import F, Case, When, Sum
 from .models import Category, StationeryItem, Customer, Sale, SaleItem, Debt, Payment
 from .models import Expenditure
 
@@ -27,11 +28,12 @@ class StationeryItemAdmin(admin.ModelAdmin):
     readonly_fields = ['profit_margin_display', 'is_low_stock_display']
 
     def profit_margin_display(self, obj):
-        return f"{obj.profit_margin:.1f}%"
+        # Stored generated column: computed by the database when the row is written
+        return f"{obj.profit_margin_gc or 0:.1f}%"
     profit_margin_display.short_description = "Profit Margin"
 
     def is_low_stock_display(self, obj):
-        if obj.is_low_stock:
+        if obj.is_low_stock_gc:
             return format_html('<span style="color: red;">LOW STOCK</span>')
         return format_html('<span style="color: green;">OK</span>')
     is_low_stock_display.short_description = "Stock Status"
@@ -54,6 +56,9 @@ class SaleAdmin(admin.ModelAdmin):
     inlines = [SaleItemInline]
     actions = ['delete_and_restore_stock']
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_profit_data()
+
     def profit_display(self, obj):
         return f"${obj.profit:.2f}"
     profit_display.short_description = "Profit"
@@ -68,13 +73,15 @@ class SaleAdmin(admin.ModelAdmin):
 
     def delete_and_restore_stock(self, request, queryset):
         """Admin action to delete selected sales and show restored stock in a message."""
-        # Collect restored quantities per item name
-        restored = {}
+        # Collect restored quantities per item name in one grouped query
+        restored_qs = SaleItem.objects.filter(sale__in=queryset).values(
+            item_name=Case(
+                When(product_type='retail', then=F('retail_item__name')),
+                When(product_type='wholesale', then=F('wholesale_item__name')),
+            )
+        ).annotate(qty=Sum('quantity')).order_by()
+        restored = {row['item_name']: row['qty'] for row in restored_qs if row['item_name']}
         total_sales = queryset.count()
-        for sale in queryset:
-            for si in sale.items.all():
-                name = si.item.name
-                restored[name] = restored.get(name, 0) + si.quantity
 
         # Perform deletion (this will trigger signals to restore stock for bulk deletes)
         queryset.delete()
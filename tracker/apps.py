@@ -1,14 +1,24 @@
+import os
+import sys
+
 from django.apps import AppConfig
 
 
+# Management commands that never need the stock/debt signal handlers wired up
+SIGNAL_FREE_COMMANDS = {'migrate', 'makemigrations'}
+
+
 class TrackerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tracker'
-    
+
     def ready(self):
-        # Import signals to ensure handlers are connected
-        try:
-            from . import signals  # noqa: F401
-        except Exception:
-            # Avoid raising during migrations or when signals import fails
-            pass
+        # Skip wiring handlers for schema commands, or when the operator opts out
+        # (e.g. DJANGO_SKIP_SIGNALS=1 python manage.py create_categories)
+        if os.getenv('DJANGO_SKIP_SIGNALS') == '1':
+            return
+        if SIGNAL_FREE_COMMANDS.intersection(sys.argv[1:2]):
+            return
+        # Import signals to ensure handlers are connected; any import error fails
+        # startup rather than leaving the stock, debt and cache handlers unwired
+        from . import signals  # noqa: F401
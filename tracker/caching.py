@@ -0,0 +1,75 @@
+"""Short-lived caching of the catalogue list aggregates, the dashboard figures, the
+customer filter dropdown and the customer list count.
+
+Entries are stored under a generation number; bumping it (see signals.py) orphans
+every cached entry at once, which works on any cache backend without key scans. The
+backend must be shared by all worker processes (settings.CACHES) for an invalidation
+in one worker to reach the others.
+"""
+import hashlib
+
+from django.core.cache import cache
+
+CATALOG_VERSION_KEY = 'catalog_stats_version'
+CATALOG_STATS_TIMEOUT = 60 * 5
+DASHBOARD_VERSION_KEY = 'dashboard_version'
+DASHBOARD_TIMEOUT = 30
+ACTIVE_CUSTOMERS_CACHE_KEY = 'active_customers'
+ACTIVE_CUSTOMERS_COUNT_CACHE_KEY = 'active_customers_count'
+ACTIVE_CUSTOMERS_TIMEOUT = 60 * 5
+
+
+def _bump(version_key):
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        # Key missing (first write or evicted): any fresh value orphans old entries too
+        cache.set(version_key, 1, None)
+
+
+def _versioned_get_or_set(version_key, key, timeout, compute):
+    version = cache.get_or_set(version_key, 1, None)
+    value = cache.get(key, version=version)
+    if value is None:
+        value = compute()
+        cache.set(key, value, timeout, version=version)
+    return value
+
+
+def bump_catalog_version():
+    """Invalidate all cached catalogue aggregates."""
+    _bump(CATALOG_VERSION_KEY)
+
+
+def cached_catalog_stats(kind, params, compute):
+    """Return compute() for the list filter `params`, cached until the catalogue changes."""
+    # Search strings are free text: hash them into a bounded, backend-safe key
+    digest = hashlib.md5(repr(sorted(params.items())).encode()).hexdigest()
+    key = f'catalog_stats:{kind}:{digest}'
+    return _versioned_get_or_set(CATALOG_VERSION_KEY, key, CATALOG_STATS_TIMEOUT, compute)
+
+
+def bump_dashboard_version():
+    """Invalidate the cached dashboard figures."""
+    _bump(DASHBOARD_VERSION_KEY)
+
+
+def cached_dashboard(day, compute):
+    """Return compute() for the local date `day`, cached briefly and until sales, debts,
+    expenditures or stock change."""
+    return _versioned_get_or_set(DASHBOARD_VERSION_KEY, f'dashboard:{day.isoformat()}', DASHBOARD_TIMEOUT, compute)
+
+
+def forget_active_customers():
+    """Drop the cached customer dropdown and active-customer count."""
+    cache.delete_many([ACTIVE_CUSTOMERS_CACHE_KEY, ACTIVE_CUSTOMERS_COUNT_CACHE_KEY])
+
+
+def cached_active_customers(compute):
+    """Return compute() (the active customers for filter dropdowns), cached until a customer changes."""
+    return cache.get_or_set(ACTIVE_CUSTOMERS_CACHE_KEY, compute, ACTIVE_CUSTOMERS_TIMEOUT)
+
+
+def cached_active_customer_count(compute):
+    """Return compute() (the number of active customers), cached until a customer changes."""
+    return cache.get_or_set(ACTIVE_CUSTOMERS_COUNT_CACHE_KEY, compute, ACTIVE_CUSTOMERS_TIMEOUT)
@@ -1,6 +1,7 @@
 from django import forms
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import UserCreationForm
+from django.core.cache import cache
 from .models import StationeryItem, Sale, SaleItem, Debt, Payment, Customer, Category, Product, Supplier, ProductCategory
 from .models import Expenditure
 
@@ -183,16 +184,50 @@ class SaleItemForm(forms.ModelForm):
         
         return cleaned_data
 
+UNIT_PRICES_CACHE_KEY = 'debt_form_unit_prices'
+
+
+def _get_unit_prices():
+    """Return {pk: unit_price} for active items, cached briefly across form instances.
+
+    Invalidated by the StationeryItem post_save/post_delete handlers in signals.py.
+    """
+    data = cache.get(UNIT_PRICES_CACHE_KEY)
+    if data is None:
+        # Raw (pk, price) tuples streamed from the cursor: no model hydration, no result cache
+        data = dict(
+            StationeryItem.objects.filter(is_active=True)
+            .values_list('pk', 'unit_price')
+            .iterator(chunk_size=1000)
+        )
+        cache.set(UNIT_PRICES_CACHE_KEY, data, 60)
+    return data
+
+
 class DebtForm(forms.ModelForm):
     unit_prices = {}
+    # Says explicitly whether `amount` is a per-unit price (multiplied by the quantity)
+    # or already the total owed
+    is_per_unit = forms.BooleanField(
+        required=False,
+        initial=True,
+        label='Amount is per unit',
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'}),
+    )
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        # Populate unit prices for JavaScript
-        self.unit_prices = {
-            str(item.pk): str(item.unit_price) 
-            for item in StationeryItem.objects.filter(is_active=True)
-        }
+        # Unit prices for JavaScript; the template serialises them with json_script
+        self.unit_prices = _get_unit_prices()
+
+    def clean(self):
+        cleaned_data = super().clean()
+        quantity = cleaned_data.get('quantity')
+        amount = cleaned_data.get('amount')
+        # Store the total owed for the quantity
+        if cleaned_data.get('is_per_unit') and cleaned_data.get('item') and quantity and amount is not None:
+            cleaned_data['amount'] = amount * quantity
+        return cleaned_data
     
     class Meta:
         model = Debt
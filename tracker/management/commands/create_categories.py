@@ -1,4 +1,6 @@
+from django.conf import settings
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from tracker.models import Category
 
 class Command(BaseCommand):
@@ -18,19 +20,23 @@ class Command(BaseCommand):
             {'name': 'Labels & Stickers', 'description': 'Address labels, decorative stickers, name tags'},
         ]
         
-        created_count = 0
+        names = [c['name'] for c in categories]
+        with transaction.atomic():
+            existing = set(Category.objects.filter(name__in=names).values_list('name', flat=True))
+            to_create = [
+                Category(name=c['name'], description=c['description'])
+                for c in categories if c['name'] not in existing
+            ]
+            Category.objects.bulk_create(to_create, ignore_conflicts=True, batch_size=settings.BULK_BATCH_SIZE)
+
+        lines = []
         for category_data in categories:
-            category, created = Category.objects.get_or_create(
-                name=category_data['name'],
-                defaults={'description': category_data['description']}
-            )
-            if created:
-                self.stdout.write(
-                    self.style.SUCCESS(f'✓ Created category: {category.name}')
-                )
-                created_count += 1
+            if category_data['name'] in existing:
+                lines.append(f"- Category already exists: {category_data['name']}")
             else:
-                self.stdout.write(f'- Category already exists: {category.name}')
+                lines.append(f"✓ Created category: {category_data['name']}")
+        self.stdout.write(self.style.SUCCESS('\n'.join(lines)))
+        created_count = len(to_create)
         
         self.stdout.write(
             self.style.SUCCESS(f'\nTotal categories created: {created_count}')
@@ -1,4 +1,8 @@
+from collections import defaultdict
+
+from django.conf import settings
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from django.utils import timezone
 from datetime import timedelta
 
@@ -8,25 +12,53 @@ class Command(BaseCommand):
     help = 'Backfill and correct due_date for auto-created debts based on their sale.sale_date (local time)'
 
     def handle(self, *args, **options):
-        qs = Debt.objects.filter(description__icontains='Auto-created').select_related('sale')
+        qs = (
+            Debt.objects.filter(auto_created=True)
+            .select_related(None)
+            .select_related('sale')
+            .only('id', 'due_date', 'sale__sale_date')
+            .order_by('id')
+        )
+        chunk_size = 2000
+        fallback = timezone.now().date() + timedelta(days=7)
+        # Many debts share a sale: resolve each sale's expected due date once
+        expected_by_sale = {}
+        # Mismatched debts grouped by their expected date: one UPDATE per distinct date, no signals
+        groups = defaultdict(list)
+        total = 0
         updated = 0
-        total = qs.count()
-        for d in qs:
-            if not d.sale:
-                continue
-            sale = d.sale
-            if getattr(sale, 'sale_date', None):
-                try:
-                    sale_local_date = timezone.localtime(sale.sale_date).date()
-                except Exception:
-                    sale_local_date = sale.sale_date.date()
-                expected = sale_local_date + timedelta(days=7)
-            else:
-                expected = (timezone.now().date() + timedelta(days=7))
-
-            if d.due_date != expected:
-                d.due_date = expected
-                d.save(update_fields=['due_date'])
-                updated += 1
+
+        def flush():
+            batch = settings.BULK_BATCH_SIZE
+            for due_date, ids in groups.items():
+                for i in range(0, len(ids), batch):
+                    Debt.objects.filter(id__in=ids[i:i + batch]).update(due_date=due_date)
+            groups.clear()
+
+        with transaction.atomic():
+            # Stream rows so only one chunk of hydrated debts is held in memory at a time
+            for d in qs.iterator(chunk_size=chunk_size):
+                total += 1
+                if not d.sale_id:
+                    continue
+                expected = expected_by_sale.get(d.sale_id)
+                if expected is None:
+                    sale = d.sale
+                    if sale.sale_date:
+                        try:
+                            sale_local_date = timezone.localtime(sale.sale_date).date()
+                        except Exception:
+                            sale_local_date = sale.sale_date.date()
+                        expected = sale_local_date + timedelta(days=7)
+                    else:
+                        expected = fallback
+                    expected_by_sale[d.sale_id] = expected
+
+                if d.due_date != expected:
+                    groups[expected].append(d.id)
+                    updated += 1
+                if total % chunk_size == 0:
+                    flush()
+            flush()
 
         self.stdout.write(self.style.SUCCESS(f'Processed {total} auto-created debts, updated {updated} due_date(s).'))
@@ -1,5 +1,6 @@
 # Generated data migration to make Debt.item required and backfill existing debts
-from django.db import migrations, models
+from django.conf import settings
+from django.db import migrations, models, transaction
 import django.db.models.deletion
 from decimal import Decimal
 
@@ -23,19 +24,43 @@ def backfill_debt_items(apps, schema_editor):
         }
     )
 
-    for d in Debt.objects.filter(item__isnull=True):
-        if d.sale_id:
-            si = SaleItem.objects.filter(sale_id=d.sale_id).order_by('pk').first()
+    # Walk the debts in pk-ordered slices so only one chunk is held in memory at a time.
+    # Keyset slices (rather than .iterator()) keep this safe on SQLite, which does not
+    # isolate an open cursor from the updates made to the same rows below.
+    chunk_size = 2000
+    last_pk = 0
+    while True:
+        debts = list(
+            Debt.objects.filter(item__isnull=True, pk__gt=last_pk)
+            .only('id', 'sale_id', 'quantity')
+            .order_by('pk')[:chunk_size]
+        )
+        if not debts:
+            break
+        last_pk = debts[-1].pk
+        sale_ids = [d.sale_id for d in debts if d.sale_id]
+
+        # First SaleItem (lowest pk) per sale, fetched in one query instead of one per debt
+        first_si = {}
+        for si in SaleItem.objects.filter(sale_id__in=sale_ids).order_by('sale_id', 'pk'):
+            first_si.setdefault(si.sale_id, si)
+
+        to_update = []
+        for d in debts:
+            si = first_si.get(d.sale_id) if d.sale_id else None
             if si:
                 d.item_id = si.item_id
                 d.quantity = si.quantity or 1
-                d.save(update_fields=['item_id', 'quantity'])
-                continue
-        # Fallback
-        d.item = misc_item
-        if not d.quantity or d.quantity <= 0:
-            d.quantity = 1
-        d.save(update_fields=['item', 'quantity'])
+            else:
+                # Fallback
+                d.item_id = misc_item.pk
+                if not d.quantity or d.quantity <= 0:
+                    d.quantity = 1
+            to_update.append(d)
+
+        # Migrations already run inside a transaction; no extra savepoint needed
+        with transaction.atomic(savepoint=False):
+            Debt.objects.bulk_update(to_update, ['item', 'quantity'], batch_size=getattr(settings, 'BULK_BATCH_SIZE', 500))
 
 
 class Migration(migrations.Migration):
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.6 on 2026-10-15 01:36
+
+from django.db import migrations, models
+
+
+def mark_auto_created_debts(apps, schema_editor):
+    Debt = apps.get_model('tracker', 'Debt')
+    # Single UPDATE; the description marker is only needed once to seed the flag
+    Debt.objects.filter(description__icontains='Auto-created').update(auto_created=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0011_alter_saleitem_unique_together_saleitem_product_type_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='debt',
+            name='auto_created',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+        migrations.RunPython(mark_auto_created_debts, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.1.6 on 2026-10-15 01:39
+
+import django.db.models.expressions
+import django.db.models.functions.comparison
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0012_debt_auto_created'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stationeryitem',
+            name='is_low_stock_gc',
+            field=models.GeneratedField(db_column='is_low_stock_gc', db_persist=True, expression=models.Q(('stock_quantity__lte', models.F('minimum_stock'))), output_field=models.BooleanField()),
+        ),
+        migrations.AddField(
+            model_name='stationeryitem',
+            name='profit_margin_gc',
+            field=models.GeneratedField(db_column='profit_margin_gc', db_persist=True, expression=models.Case(models.When(cost_price__gt=0, then=models.ExpressionWrapper(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.functions.comparison.Cast(django.db.models.expressions.CombinedExpression(models.F('unit_price'), '-', models.F('cost_price')), models.FloatField()), '*', models.Value(100)), '/', models.F('cost_price')), output_field=models.DecimalField(decimal_places=2, max_digits=12))), default=models.Value(Decimal('0'))), output_field=models.DecimalField(decimal_places=2, max_digits=12)),
+        ),
+    ]
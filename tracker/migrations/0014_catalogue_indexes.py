@@ -0,0 +1,54 @@
+# Generated by Django 5.1.6 on 2026-10-15 01:41
+
+from django.db import migrations, models
+
+
+SKU_PREFIX_INDEXES = [
+    ('tracker_product_sku_prefix_idx', 'tracker_product'),
+    ('tracker_stationeryitem_sku_prefix_idx', 'tracker_stationeryitem'),
+]
+
+
+def create_sku_prefix_indexes(apps, schema_editor):
+    # The unique index on sku can't serve LIKE 'prefix%' under non-C collations on
+    # PostgreSQL; varchar_pattern_ops can. Other backends already use the unique index.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, table in SKU_PREFIX_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" ("sku" varchar_pattern_ops)'
+        )
+
+
+def drop_sku_prefix_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _table in SKU_PREFIX_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0013_stationeryitem_generated_columns'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['created_at'], name='product_created_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['category', 'is_active'], name='product_cat_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stationeryitem',
+            index=models.Index(fields=['created_at'], name='stationery_created_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stationeryitem',
+            index=models.Index(fields=['category', 'is_active'], name='stationery_cat_active_idx'),
+        ),
+        migrations.RunPython(create_sku_prefix_indexes, reverse_code=drop_sku_prefix_indexes),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.6 on 2026-10-15 01:43
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_total_cost(apps, schema_editor):
+    Sale = apps.get_model('tracker', 'Sale')
+    SaleItem = apps.get_model('tracker', 'SaleItem')
+    # One correlated UPDATE instead of loading every sale and its items
+    cost = (
+        SaleItem.objects.filter(sale=OuterRef('pk'), product_type='retail')
+        .values('sale')
+        .annotate(cost=Sum(F('quantity') * F('retail_item__cost_price')))
+        .values('cost')
+    )
+    Sale.objects.update(
+        total_cost=Coalesce(Subquery(cost, output_field=models.DecimalField()), 0, output_field=models.DecimalField())
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0014_catalogue_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sale',
+            name='total_cost',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12),
+        ),
+        migrations.RunPython(backfill_total_cost, reverse_code=migrations.RunPython.noop),
+    ]
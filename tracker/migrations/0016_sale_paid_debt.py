@@ -0,0 +1,41 @@
+# Generated by Django 5.1.6 on 2026-10-15 01:44
+
+import re
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+_DEBT_NOTE_RE = re.compile(r'Payment for Debt #(\d+)')
+
+
+def link_payment_sales(apps, schema_editor):
+    Sale = apps.get_model('tracker', 'Sale')
+    Debt = apps.get_model('tracker', 'Debt')
+    # Parse the legacy notes marker once; from now on add_payment sets paid_debt directly
+    sales = []
+    for sale in Sale.objects.filter(notes__contains='Payment for Debt #').only('id', 'notes'):
+        m = _DEBT_NOTE_RE.search(sale.notes)
+        if m:
+            sale.paid_debt_id = int(m.group(1))
+            sales.append(sale)
+    existing = set(Debt.objects.filter(pk__in={s.paid_debt_id for s in sales}).values_list('pk', flat=True))
+    sales = [s for s in sales if s.paid_debt_id in existing]
+    Sale.objects.bulk_update(sales, ['paid_debt'], batch_size=getattr(settings, 'BULK_BATCH_SIZE', 500))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0015_sale_total_cost'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sale',
+            name='paid_debt',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='payment_sales', to='tracker.debt'),
+        ),
+        migrations.RunPython(link_payment_sales, reverse_code=migrations.RunPython.noop),
+    ]
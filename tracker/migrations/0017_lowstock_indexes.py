@@ -0,0 +1,29 @@
+# Generated by Django 5.1.6 on 2026-10-15 01:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0016_sale_paid_debt'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'cartons_in_stock', 'minimum_cartons'], name='prod_lowstock_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('cartons_in_stock__lte', models.F('minimum_cartons')), ('is_active', True)), fields=['cartons_in_stock'], name='prod_lowstock_partial'),
+        ),
+        migrations.AddIndex(
+            model_name='stationeryitem',
+            index=models.Index(fields=['is_active', 'stock_quantity', 'minimum_stock'], name='stationery_lowstock_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stationeryitem',
+            index=models.Index(condition=models.Q(('is_active', True), ('stock_quantity__lte', models.F('minimum_stock'))), fields=['stock_quantity'], name='stationery_lowstock_partial'),
+        ),
+    ]
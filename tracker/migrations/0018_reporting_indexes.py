@@ -0,0 +1,40 @@
+# Generated by Django 5.1.6 on 2026-10-15 01:47
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0017_lowstock_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='debt',
+            name='due_date',
+            field=models.DateField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='debt',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('partial', 'Partially Paid'), ('paid', 'Paid'), ('overdue', 'Overdue')], db_index=True, default='pending', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='expenditure',
+            name='expense_date',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name='sale',
+            name='sale_date',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AddIndex(
+            model_name='debt',
+            index=models.Index(fields=['status', 'due_date'], name='debt_status_due_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.6 on 2026-10-15 02:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0018_reporting_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['is_paid', '-sale_date', '-id'], name='sale_paid_date_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.6 on 2026-10-15 02:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0019_sale_paid_date_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='saleitem',
+            index=models.Index(fields=['retail_item', 'sale'], name='saleitem_retail_sale_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='saleitem',
+            index=models.Index(fields=['wholesale_item', 'sale'], name='saleitem_wholesale_sale_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.1.6 on 2026-10-15 02:11
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def build_daily_summary(apps, schema_editor):
+    Sale = apps.get_model('tracker', 'Sale')
+    SaleDailySummary = apps.get_model('tracker', 'SaleDailySummary')
+    # Same buckets as SaleDailySummary.refresh: paid sales per local day
+    rows = (
+        Sale.objects.filter(is_paid=True)
+        .annotate(day=TruncDate('sale_date'))
+        .values('day')
+        .annotate(total=Sum('total_amount'), count=Count('id'))
+        .order_by()
+    )
+    SaleDailySummary.objects.bulk_create(
+        [SaleDailySummary(day=row['day'], total=row['total'] or 0, count=row['count']) for row in rows],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0020_saleitem_item_sale_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SaleDailySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['day'],
+            },
+        ),
+        migrations.RunPython(build_daily_summary, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.6 on 2026-10-15 02:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0021_sale_daily_summary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='debt',
+            index=models.Index(fields=['customer', '-created_at'], name='debt_cust_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['customer', '-sale_date'], name='sale_cust_date_idx'),
+        ),
+    ]
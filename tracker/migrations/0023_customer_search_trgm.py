@@ -0,0 +1,38 @@
+# Generated by Django 5.1.6 on 2026-10-15 12:10
+
+from django.db import migrations
+
+
+CUSTOMER_SEARCH_COLUMNS = ['name', 'email', 'phone']
+
+
+def create_customer_trgm_indexes(apps, schema_editor):
+    # icontains compiles to UPPER("col"::text) LIKE UPPER('%q%') on PostgreSQL; a
+    # trigram GIN index on that expression serves the leading-wildcard match that a
+    # btree can't. SQLite has no trigram indexes, so it keeps scanning.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for column in CUSTOMER_SEARCH_COLUMNS:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS "tracker_customer_{column}_trgm_idx" '
+            f'ON "tracker_customer" USING gin (UPPER("{column}"::text) gin_trgm_ops)'
+        )
+
+
+def drop_customer_trgm_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for column in CUSTOMER_SEARCH_COLUMNS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "tracker_customer_{column}_trgm_idx"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0022_customer_date_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_customer_trgm_indexes, reverse_code=drop_customer_trgm_indexes),
+    ]
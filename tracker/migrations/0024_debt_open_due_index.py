@@ -0,0 +1,19 @@
+# Generated by Django 5.1.6 on 2026-10-15 02:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0023_customer_search_trgm'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='debt',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'partial', 'overdue'])), fields=['due_date'], name='debt_open_due_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.6 on 2026-10-15 02:44
+
+from django.db import migrations, models
+
+
+def flag_payment_sales(apps, schema_editor):
+    Sale = apps.get_model('tracker', 'Sale')
+    # Linked payment sales, plus those whose debt was deleted (paid_debt cleared) and
+    # are only recognisable by the legacy notes marker
+    Sale.objects.filter(
+        models.Q(paid_debt__isnull=False) | models.Q(notes__contains='Payment for Debt')
+    ).update(is_payment=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0024_debt_open_due_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sale',
+            name='is_payment',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(flag_payment_sales, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.6 on 2026-10-15 03:05
+
+from django.core.management import call_command
+from django.db import migrations
+
+
+def create_cache_table(apps, schema_editor):
+    # Only acts if CACHES is pointed at a DatabaseCache (the shipped settings use Redis
+    # or LocMemCache); createcachetable skips tables that exist and other backends
+    call_command('createcachetable', database=schema_editor.connection.alias, verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0025_sale_is_payment'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_cache_table, reverse_code=migrations.RunPython.noop),
+    ]
@@ -1,10 +1,60 @@
-from django.db import models
+import datetime
+import re
+
+from django.db import IntegrityError, models, transaction
+from django.db.models.functions import Cast, Length, Substr, TruncDate
 from django.utils import timezone
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator
 from decimal import Decimal
 
 
+# Shared Decimal constants so hot paths don't re-parse literals on every call
+ZERO = Decimal('0')
+ONE_CENT = Decimal('0.01')
+HUNDRED = Decimal(100)
+
+# Compiled once: generate_sku strips names on every auto-SKU save
+_SKU_STRIP_RE = re.compile(r'[^A-Za-z0-9]')
+
+# Attempts at inserting a row with a generated SKU before giving up on a collision
+SKU_SAVE_ATTEMPTS = 5
+
+
+def _sku_sequence(model, prefix):
+    """Return the numeric sequence of the highest existing SKU under prefix (0 if none)."""
+    # Longest first: as strings '...-999' sorts above '...-1000'. Legacy collision
+    # suffixes ('...-001-1') are skipped; their base SKU exists as well. The prefix is
+    # only letters, digits and dashes, so it is literal inside the regex
+    latest = (
+        model.objects.filter(sku__startswith=prefix, sku__regex=rf'^{prefix}[0-9]+$')
+        .order_by(Length('sku').desc(), '-sku')
+        .values_list('sku', flat=True)
+        .first()
+    )
+    return int(latest[len(prefix):]) if latest else 0
+
+
+def _save_with_generated_sku(instance, save, *args, **kwargs):
+    """Insert a row whose SKU was just generated, relying on the unique constraint.
+
+    If a concurrent insert claimed the same SKU, bump the sequence and retry instead
+    of pre-checking with exists() queries.
+    """
+    for attempt in range(SKU_SAVE_ATTEMPTS):
+        try:
+            with transaction.atomic():
+                save(*args, **kwargs)
+            return
+        except IntegrityError:
+            # Only a collision on the generated SKU is retried; any other violation
+            # (a bad foreign key, another unique field) propagates
+            if attempt == SKU_SAVE_ATTEMPTS - 1 or not type(instance).objects.filter(sku=instance.sku).exists():
+                raise
+            prefix, _, sequential = instance.sku.rpartition('-')
+            instance.sku = f"{prefix}-{str(int(sequential) + 1).zfill(3)}"
+
+
 class Supplier(models.Model):
     """Supplier information for products"""
     name = models.CharField(max_length=200)
@@ -50,6 +100,48 @@ class Category(models.Model):
         return self.name
 
 
+# Enough of a description for list pages' truncatechars:50 (one extra char keeps the ellipsis)
+LIST_DESCRIPTION_CHARS = 51
+
+
+def _apply_stock_deltas(model, stock_field, deltas):
+    """Add {pk: delta} to `stock_field` for several rows in a single CASE UPDATE."""
+    model.objects.filter(pk__in=deltas).update(**{
+        stock_field: models.F(stock_field) + models.Case(
+            *[models.When(pk=pk, then=models.Value(delta)) for pk, delta in deltas.items()],
+            output_field=models.IntegerField(),
+        )
+    })
+
+
+class ProductQuerySet(models.QuerySet):
+    def for_list(self):
+        """Load only the columns product listings render, plus a short description snippet."""
+        return self.select_related('category', 'supplier').only(
+            'id', 'name', 'sku', 'cartons_in_stock', 'minimum_cartons', 'units_per_carton',
+            'selling_price', 'supplier_price', 'stationery_item', 'category__name', 'supplier__name',
+        ).annotate(description_snippet=Substr('description', 1, LIST_DESCRIPTION_CHARS))
+
+    def with_margins(self):
+        """Annotate profit_margin in SQL so listings don't do a Decimal division per row.
+
+        The annotation is picked up by the Product.profit_margin property.
+        """
+        return self.annotate(profit_margin=models.Case(
+            models.When(
+                supplier_price__gt=0,
+                # Float cast keeps SQLite from truncating to integer division
+                then=models.ExpressionWrapper(
+                    Cast(models.F('selling_price') - models.F('supplier_price'), models.FloatField())
+                    * 100 / models.F('supplier_price'),
+                    output_field=models.DecimalField(max_digits=12, decimal_places=2),
+                ),
+            ),
+            default=models.Value(ZERO),
+            output_field=models.DecimalField(max_digits=12, decimal_places=2),
+        ))
+
+
 class Product(models.Model):
     """Product model for items sold in cartons"""
     UNIT_CHOICES = [
@@ -67,8 +159,8 @@ class Product(models.Model):
     stationery_item = models.OneToOneField('StationeryItem', on_delete=models.CASCADE, related_name='product', blank=True, null=True, help_text="Link to corresponding stationery item")
     
     # Pricing
-    supplier_price = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(Decimal('0.01'))], help_text="Price from supplier")
-    selling_price = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(Decimal('0.01'))])
+    supplier_price = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(ONE_CENT)], help_text="Price from supplier")
+    selling_price = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(ONE_CENT)])
     
     # Carton information
     units_per_carton = models.PositiveIntegerField(default=1, help_text="Number of units in one carton")
@@ -85,8 +177,21 @@ class Product(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
 
+    objects = ProductQuerySet.as_manager()
+
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['created_at'], name='product_created_at_idx'),
+            models.Index(fields=['category', 'is_active'], name='product_cat_active_idx'),
+            models.Index(fields=['is_active', 'cartons_in_stock', 'minimum_cartons'], name='prod_lowstock_idx'),
+            # Partial index holding only the (few) low-stock active rows for the dashboard count
+            models.Index(
+                fields=['cartons_in_stock'],
+                condition=models.Q(is_active=True, cartons_in_stock__lte=models.F('minimum_cartons')),
+                name='prod_lowstock_partial',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.sku})"
@@ -98,11 +203,18 @@ class Product(models.Model):
 
     @property
     def profit_margin(self):
-        """Calculate profit margin percentage"""
+        """Calculate profit margin percentage (precomputed when loaded via with_margins())"""
+        if '_profit_margin' in self.__dict__:
+            return self._profit_margin
         if self.supplier_price > 0:
-            return ((self.selling_price - self.supplier_price) / self.supplier_price) * 100
+            return ((self.selling_price - self.supplier_price) / self.supplier_price) * HUNDRED
         return 0
 
+    @profit_margin.setter
+    def profit_margin(self, value):
+        # Receives the with_margins() annotation
+        self._profit_margin = value
+
     @property
     def profit_per_carton(self):
         """Calculate profit per carton"""
@@ -117,60 +229,82 @@ class Product(models.Model):
         """Get total value of current stock"""
         return self.cartons_in_stock * self.selling_price
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the loaded stock inputs so save() can skip an unneeded item sync
+        instance._loaded_stock = instance._stock_state()
+        return instance
+
+    def _stock_state(self):
+        # Read through __dict__ so deferred fields don't trigger a query
+        return tuple(self.__dict__.get(f) for f in ('cartons_in_stock', 'units_per_carton', 'stationery_item_id'))
+
     def save(self, *args, **kwargs):
         """Override save to sync with StationeryItem and generate SKU if needed"""
-        # Generate SKU if not provided
-        if not self.sku:
-            self.sku = self.generate_sku()
-        
-        super().save(*args, **kwargs)
-        self.sync_with_stationery_item()
+        # Product row and linked item stock commit together (one transaction, one flush)
+        with transaction.atomic():
+            # Generate SKU if not provided
+            if not self.sku:
+                self.sku = self.generate_sku()
+                _save_with_generated_sku(self, super().save, *args, **kwargs)
+            else:
+                super().save(*args, **kwargs)
+            # Only touch the linked item when its stock inputs actually changed
+            stock_state = self._stock_state()
+            if getattr(self, '_loaded_stock', None) != stock_state:
+                self.sync_with_stationery_item()
+                self._loaded_stock = stock_state
 
     def generate_sku(self):
         """Generate automatic SKU based on product name and category"""
-        import re
-        import datetime
-        
         # Get category abbreviation
         category_abbr = ""
         if self.category:
             # Take first 3 letters of category name, remove spaces/special chars
-            category_abbr = re.sub(r'[^A-Za-z0-9]', '', self.category.name)[:3].upper()
+            category_abbr = _SKU_STRIP_RE.sub('', self.category.name)[:3].upper()
         
         # Take first 3 letters of product name, remove spaces/special chars
-        name_abbr = re.sub(r'[^A-Za-z0-9]', '', self.name)[:3].upper()
+        name_abbr = _SKU_STRIP_RE.sub('', self.name)[:3].upper()
         
         # Get current year last 2 digits
         year_suffix = str(datetime.datetime.now().year)[-2:]
         
-        # Get sequential number for today
-        today = datetime.datetime.now().date()
-        count_today = Product.objects.filter(
-            created_at__date=today
-        ).count()
-        
+        # Next sequential number after the highest SKU sharing this prefix (one indexed query)
+        prefix = f"{category_abbr}-{name_abbr}-{year_suffix}-"
         # Generate sequential number (3 digits, padded with zeros)
-        sequential = str(count_today + 1).zfill(3)
-        
-        # Combine: CATEGORY-NAME-YEAR-SEQUENTIAL
-        sku = f"{category_abbr}-{name_abbr}-{year_suffix}-{sequential}"
+        sequential = str(_sku_sequence(Product, prefix) + 1).zfill(3)
         
-        # Ensure uniqueness
-        original_sku = sku
-        counter = 1
-        while Product.objects.filter(sku=sku).exists():
-            sku = f"{original_sku}-{counter}"
-            counter += 1
-        
-        return sku
+        # Combine: CATEGORY-NAME-YEAR-SEQUENTIAL; uniqueness is enforced on insert by save()
+        return f"{prefix}{sequential}"
 
     def sync_with_stationery_item(self):
         """Sync product stock with corresponding stationery item"""
-        if self.stationery_item:
-            # Only update the stock quantity, not pricing
-            self.stationery_item.stock_quantity = self.total_units_in_stock
-            # Keep existing pricing in stationery item
-            self.stationery_item.save()
+        if self.stationery_item_id:
+            # Only update the stock quantity, not pricing (computed once, skipped if unchanged)
+            qty = self.cartons_in_stock * self.units_per_carton
+            item = self.stationery_item
+            if item.stock_quantity != qty:
+                item.stock_quantity = qty
+                # Keep existing pricing in stationery item
+                item.save(update_fields=['stock_quantity'])
+
+    @classmethod
+    def sync_stock_bulk(cls, products=None):
+        """Sync linked StationeryItem stock for many products in a single UPDATE.
+
+        `products` may be a Product queryset or an iterable of pks (default: all).
+        Use after bulk imports/updates that bypass save(); interactive edits still
+        go through the per-row sync in save().
+        """
+        if products is None:
+            products = cls.objects.all()
+        units = cls.objects.filter(stationery_item=models.OuterRef('pk')).values(
+            units=models.F('cartons_in_stock') * models.F('units_per_carton')
+        )[:1]
+        return StationeryItem.objects.filter(product__in=products).update(
+            stock_quantity=models.Subquery(units)
+        )
 
     def create_stationery_item(self):
         """Create a corresponding stationery item for this product"""
@@ -178,40 +312,98 @@ class Product(models.Model):
             # Use the same category for the stationery item
             stationery_category = self.category
             
-            # Create the stationery item with default pricing (user can update later)
-            stationery_item = StationeryItem.objects.create(
-                name=self.name,
-                description=self.description,
-                category=stationery_category,
-                sku=self.sku,
-                unit_price=self.selling_price,  # Initial value, user can change
-                cost_price=self.supplier_price,  # Initial value, user can change
-                stock_quantity=self.total_units_in_stock,
-                minimum_stock=self.minimum_cartons * self.units_per_carton,  # Convert to units
-                supplier=self.supplier.name,
-                is_active=self.is_active
-            )
+            upc = self.units_per_carton
+            # Reuse the product SKU; if a stationery item already holds it, let the unique
+            # constraint say so and fall back to a suffixed SKU (no exists() pre-check)
+            for attempt in range(SKU_SAVE_ATTEMPTS):
+                sku = self.sku if attempt == 0 else f"{self.sku}-{attempt}"
+                try:
+                    with transaction.atomic():
+                        # Create the stationery item with default pricing (user can update later)
+                        stationery_item = StationeryItem.objects.create(
+                            name=self.name,
+                            description=self.description,
+                            category=stationery_category,
+                            sku=sku,
+                            unit_price=self.selling_price,  # Initial value, user can change
+                            cost_price=self.supplier_price,  # Initial value, user can change
+                            stock_quantity=self.cartons_in_stock * upc,
+                            minimum_stock=self.minimum_cartons * upc,  # Convert to units
+                            supplier=self.supplier.name,
+                            is_active=self.is_active
+                        )
+                    break
+                except IntegrityError:
+                    # Only a taken SKU moves on to the next suffix; any other violation
+                    # (e.g. a CHECK on the stock columns) propagates
+                    if attempt == SKU_SAVE_ATTEMPTS - 1 or not StationeryItem.objects.filter(sku=sku).exists():
+                        raise
             self.stationery_item = stationery_item
             self.save()
 
 
+class StationeryItemQuerySet(models.QuerySet):
+    def for_list(self):
+        """Load only the columns item listings render, plus a short description snippet."""
+        return self.select_related('category').only(
+            'id', 'name', 'sku', 'unit_price', 'cost_price', 'stock_quantity', 'minimum_stock',
+            'is_active', 'category__name',
+        ).annotate(description_snippet=Substr('description', 1, LIST_DESCRIPTION_CHARS))
+
+
 class StationeryItem(models.Model):
     """Model for stationery items/commodities"""
     name = models.CharField(max_length=200)
     description = models.TextField(blank=True)
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='items')
     sku = models.CharField(max_length=50, unique=True, help_text="Stock Keeping Unit")
-    unit_price = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(Decimal('0.01'))])
-    cost_price = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(Decimal('0.01'))])
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(ONE_CENT)])
+    cost_price = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(ONE_CENT)])
     stock_quantity = models.PositiveIntegerField(default=0)
     minimum_stock = models.PositiveIntegerField(default=0, help_text="Minimum stock level before reorder")
     supplier = models.CharField(max_length=200, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
+    # Stored generated columns: computed by the database on write so list pages just read them
+    profit_margin_gc = models.GeneratedField(
+        expression=models.Case(
+            models.When(
+                cost_price__gt=0,
+                # Float cast keeps SQLite from truncating to integer division
+                then=models.ExpressionWrapper(
+                    Cast(models.F('unit_price') - models.F('cost_price'), models.FloatField())
+                    * 100 / models.F('cost_price'),
+                    output_field=models.DecimalField(max_digits=12, decimal_places=2),
+                ),
+            ),
+            default=models.Value(ZERO),
+        ),
+        output_field=models.DecimalField(max_digits=12, decimal_places=2),
+        db_persist=True,
+        db_column='profit_margin_gc',
+    )
+    is_low_stock_gc = models.GeneratedField(
+        expression=models.Q(stock_quantity__lte=models.F('minimum_stock')),
+        output_field=models.BooleanField(),
+        db_persist=True,
+        db_column='is_low_stock_gc',
+    )
+
+    objects = StationeryItemQuerySet.as_manager()
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['created_at'], name='stationery_created_at_idx'),
+            models.Index(fields=['category', 'is_active'], name='stationery_cat_active_idx'),
+            models.Index(fields=['is_active', 'stock_quantity', 'minimum_stock'], name='stationery_lowstock_idx'),
+            models.Index(
+                fields=['stock_quantity'],
+                condition=models.Q(is_active=True, stock_quantity__lte=models.F('minimum_stock')),
+                name='stationery_lowstock_partial',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.sku})"
@@ -220,7 +412,7 @@ class StationeryItem(models.Model):
     def profit_margin(self):
         """Calculate profit margin percentage"""
         if self.cost_price > 0:
-            return ((self.unit_price - self.cost_price) / self.cost_price) * 100
+            return ((self.unit_price - self.cost_price) / self.cost_price) * HUNDRED
         return 0
 
     @property
@@ -234,49 +426,34 @@ class StationeryItem(models.Model):
 
     def generate_sku(self):
         """Generate automatic SKU based on product name and category"""
-        import re
-        import datetime
-        
         # Get category abbreviation
         category_abbr = ""
         if self.category:
             # Take first 3 letters of category name, remove spaces/special chars
-            category_abbr = re.sub(r'[^A-Za-z0-9]', '', self.category.name)[:3].upper()
+            category_abbr = _SKU_STRIP_RE.sub('', self.category.name)[:3].upper()
         
         # Take first 3 letters of product name, remove spaces/special chars
-        name_abbr = re.sub(r'[^A-Za-z0-9]', '', self.name)[:3].upper()
+        name_abbr = _SKU_STRIP_RE.sub('', self.name)[:3].upper()
         
         # Get current year last 2 digits
         year_suffix = str(datetime.datetime.now().year)[-2:]
         
-        # Get sequential number for today
-        today = datetime.datetime.now().date()
-        count_today = StationeryItem.objects.filter(
-            created_at__date=today
-        ).count()
-        
+        # Next sequential number after the highest SKU sharing this prefix (one indexed query)
+        prefix = f"{category_abbr}-{name_abbr}-{year_suffix}-"
         # Generate sequential number (3 digits, padded with zeros)
-        sequential = str(count_today + 1).zfill(3)
-        
-        # Combine: CATEGORY-NAME-YEAR-SEQUENTIAL
-        sku = f"{category_abbr}-{name_abbr}-{year_suffix}-{sequential}"
-        
-        # Ensure uniqueness
-        original_sku = sku
-        counter = 1
-        while StationeryItem.objects.filter(sku=sku).exists():
-            sku = f"{original_sku}-{counter}"
-            counter += 1
+        sequential = str(_sku_sequence(StationeryItem, prefix) + 1).zfill(3)
         
-        return sku
+        # Combine: CATEGORY-NAME-YEAR-SEQUENTIAL; uniqueness is enforced on insert by save()
+        return f"{prefix}{sequential}"
 
     def save(self, *args, **kwargs):
         """Override save to generate SKU if needed"""
         # Generate SKU if not provided
         if not self.sku:
             self.sku = self.generate_sku()
-        
-        super().save(*args, **kwargs)
+            _save_with_generated_sku(self, super().save, *args, **kwargs)
+        else:
+            super().save(*args, **kwargs)
 
 
 class Customer(models.Model):
@@ -295,6 +472,27 @@ class Customer(models.Model):
         return self.name
 
 
+class SaleQuerySet(models.QuerySet):
+    def with_profit_data(self):
+        """Load everything Sale.profit reads so it runs without per-row queries.
+
+        Joins the paid debt (and its originating sale and item) for payment sales,
+        and prefetches item ids to tell item sales from payment sales.
+
+        Use this instead of a bare Sale.objects.all() on pages that show profit
+        for many sales (dashboards, reports, admin lists).
+        """
+        return self.select_related('paid_debt__sale', 'paid_debt__item').prefetch_related(
+            models.Prefetch('items', queryset=SaleItem.objects.only('sale'))
+        )
+
+
+class SaleManager(models.Manager.from_queryset(SaleQuerySet)):
+    def get_queryset(self):
+        # Sale.__str__ and every listing read the customer and creator
+        return super().get_queryset().select_related('customer', 'created_by')
+
+
 class Sale(models.Model):
     """Sales transaction model"""
     PAYMENT_CHOICES = [
@@ -305,19 +503,48 @@ class Sale(models.Model):
     ]
 
     customer = models.ForeignKey(Customer, on_delete=models.SET_NULL, null=True, blank=True)
-    sale_date = models.DateTimeField(auto_now_add=True)
-    total_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0.00, validators=[MinValueValidator(Decimal('0.00'))])
+    sale_date = models.DateTimeField(auto_now_add=True, db_index=True)
+    total_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0.00, validators=[MinValueValidator(ZERO)])
+    # Denormalised cost of goods sold, kept in step with the line items by signals.py
+    total_cost = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False)
     payment_method = models.CharField(max_length=20, choices=PAYMENT_CHOICES, default='cash')
     is_paid = models.BooleanField(default=True)
     notes = models.TextField(blank=True)
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
+    # Set on sales recorded for a debt payment, so they join to the debt instead of parsing notes
+    paid_debt = models.ForeignKey('Debt', on_delete=models.SET_NULL, null=True, blank=True, related_name='payment_sales')
+    # Marks a debt-payment sale for good: paid_debt is cleared if the debt is deleted,
+    # but the cash received must stay in the sales list
+    is_payment = models.BooleanField(default=False, editable=False)
+
+    objects = SaleManager()
 
     class Meta:
         ordering = ['-sale_date']
+        indexes = [
+            # Paid/unpaid listings and dashboard ranges: equality on is_paid, then the
+            # (-sale_date, -id) order the sales list and its keyset cursor walk
+            models.Index(fields=['is_paid', '-sale_date', '-id'], name='sale_paid_date_idx'),
+            # A customer's recent sales: range scan on the customer, already in date order
+            models.Index(fields=['customer', '-sale_date'], name='sale_cust_date_idx'),
+        ]
 
     def __str__(self):
         return f"Sale #{self.id} - {self.customer or 'Walk-in'} - TZS {self.total_amount:,.0f}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the loaded debt inputs so the post_save debt sync can be skipped
+        # when a save didn't change any of them (see signals.sync_debt_on_sale_save)
+        instance._loaded_debt_state = instance.debt_state()
+        return instance
+
+    def debt_state(self):
+        """The fields an auto-created debt is derived from."""
+        # Read through __dict__ so deferred fields don't trigger a query
+        return tuple(self.__dict__.get(f) for f in ('customer_id', 'total_amount', 'is_paid', 'paid_debt_id', 'sale_date'))
+
     @property
     def profit(self):
         """Calculate total profit for this sale.
@@ -328,27 +555,20 @@ class Sale(models.Model):
         a partial payment for a debt created from a sale will carry the same
         fraction of the original sale's profit.
         """
-        # Normal case: sale with items
-        items = list(self.items.all())
-        if items:
-            total_cost = sum(
-                (item.retail_item.cost_price if item.product_type == 'retail' and item.retail_item else Decimal('0')) * item.quantity 
-                for item in items
-            )
-            return self.total_amount - total_cost
-
-        # Payment-sale case: try to infer associated debt and originating sale
-        notes = (self.notes or '')
-        import re
-        m = re.search(r'Payment for Debt #(?P<debt_id>\d+)', notes)
-        if m:
-            from .models import Debt
-            debt_id = int(m.group('debt_id'))
-            try:
-                debt = Debt.objects.get(pk=debt_id)
-            except Debt.DoesNotExist:
-                return self.total_amount
-
+        # Normal case: sale with items; cost of goods is stored on the sale itself.
+        # The exists() check is served from the prefetch cache under with_profit_data().
+        if self.total_cost or self.items.exists():
+            return self.total_amount - self.total_cost
+
+        # Payment-sale case: use the debt this sale paid towards and its originating sale
+        if self.paid_debt_id:
+            if Sale.paid_debt.is_cached(self):
+                debt = self.paid_debt
+            else:
+                # One query for the debt plus the only columns the allocation below reads
+                debt = Debt.objects.select_related(None).select_related('sale', 'item').only(
+                    'amount', 'quantity', 'sale__total_amount', 'sale__total_cost', 'item__cost_price',
+                ).get(pk=self.paid_debt_id)
             # If debt points to an originating sale (the sale that created the debt), use it
             orig_sale = None
             if debt.sale and debt.sale.pk != self.pk:
@@ -365,7 +585,7 @@ class Sale(models.Model):
                 # (i.e., manually created debt), compute the original profit as (debt.amount - total_cost)
                 # where total_cost = item.cost_price * quantity, and allocate proportionally.
                 if debt.item and debt.amount and debt.amount > 0:
-                    total_cost = (debt.item.cost_price or Decimal('0.00')) * (debt.quantity or 1)
+                    total_cost = (debt.item.cost_price or ZERO) * (debt.quantity or 1)
                     orig_profit = debt.amount - total_cost
                     ratio = (self.total_amount / debt.amount)
                     return (orig_profit * ratio)
@@ -375,7 +595,7 @@ class Sale(models.Model):
 
         # Fallback for payments without originating sale: no cost information -> profit undefined
         # Treat profit as 0 to avoid overstating profit for a pure cash receipt with no COGS
-        return Decimal('0')
+        return ZERO
 
 
 class SaleItem(models.Model):
@@ -390,14 +610,19 @@ class SaleItem(models.Model):
     retail_item = models.ForeignKey(StationeryItem, on_delete=models.CASCADE, null=True, blank=True, related_name='retail_sale_items')
     wholesale_item = models.ForeignKey(Product, on_delete=models.CASCADE, null=True, blank=True, related_name='wholesale_sale_items')
     quantity = models.PositiveIntegerField(validators=[MinValueValidator(1)])
-    unit_price = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(Decimal('0.01'))])
-    total_price = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(Decimal('0.01'))])
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(ONE_CENT)])
+    total_price = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(ONE_CENT)])
 
     class Meta:
         constraints = [
             models.UniqueConstraint(fields=['sale', 'retail_item'], condition=models.Q(product_type='retail'), name='unique_retail_sale_item'),
             models.UniqueConstraint(fields=['sale', 'wholesale_item'], condition=models.Q(product_type='wholesale'), name='unique_wholesale_sale_item'),
         ]
+        indexes = [
+            # Item -> sales lookups (recent sales on the detail pages) probe these index-only
+            models.Index(fields=['retail_item', 'sale'], name='saleitem_retail_sale_idx'),
+            models.Index(fields=['wholesale_item', 'sale'], name='saleitem_wholesale_sale_idx'),
+        ]
 
     def __str__(self):
         if self.product_type == 'retail' and self.retail_item:
@@ -436,36 +661,138 @@ class SaleItem(models.Model):
     def save(self, *args, **kwargs):
         self.total_price = self.quantity * self.unit_price
         
-        # Handle stock reduction
-        is_new = self.pk is None
+        # Stock deduction and the line insert succeed or fail together
+        with transaction.atomic():
+            # Handle stock reduction
+            is_new = self.pk is None
         
-        if is_new:
-            # New sale item - reduce stock
-            if self.product_type == 'retail' and self.retail_item:
-                if self.retail_item.stock_quantity < self.quantity:
-                    raise ValueError(f'Insufficient stock for {self.retail_item.name}. Available: {self.retail_item.stock_quantity}, Requested: {self.quantity}')
-                self.retail_item.stock_quantity -= self.quantity
-                self.retail_item.save()
-            elif self.product_type == 'wholesale' and self.wholesale_item:
-                if self.wholesale_item.cartons_in_stock < self.quantity:
-                    raise ValueError(f'Insufficient stock for {self.wholesale_item.name}. Available: {self.wholesale_item.cartons_in_stock}, Requested: {self.quantity}')
-                self.wholesale_item.cartons_in_stock -= self.quantity
-                self.wholesale_item.save()
+            if is_new:
+                # New sale item - reduce stock
+                self.take_stock(self.quantity)
         
-        super().save(*args, **kwargs)
-    
-    def delete(self, *args, **kwargs):
-        # Restore stock when sale item is deleted
+            super().save(*args, **kwargs)
+
+    def take_stock(self, quantity):
+        """Deduct `quantity` of this line's item from stock, or raise ValueError if short.
+
+        One conditional UPDATE lets the database enforce "enough stock" atomically, with no
+        separate read or row lock; a zero row count means the stock ran out.
+        """
         if self.product_type == 'retail' and self.retail_item:
-            self.retail_item.stock_quantity += self.quantity
-            self.retail_item.save()
+            updated = StationeryItem.objects.filter(
+                pk=self.retail_item_id, stock_quantity__gte=quantity,
+            ).update(stock_quantity=models.F('stock_quantity') - quantity)
+            if not updated:
+                self.retail_item.refresh_from_db(fields=['stock_quantity'])
+                raise ValueError(f'Insufficient stock for {self.retail_item.name}. Available: {self.retail_item.stock_quantity}, Requested: {quantity}')
+            self.retail_item.stock_quantity -= quantity
         elif self.product_type == 'wholesale' and self.wholesale_item:
-            self.wholesale_item.cartons_in_stock += self.quantity
-            self.wholesale_item.save()
-        
+            updated = Product.objects.filter(
+                pk=self.wholesale_item_id, cartons_in_stock__gte=quantity,
+            ).update(cartons_in_stock=models.F('cartons_in_stock') - quantity)
+            if not updated:
+                self.wholesale_item.refresh_from_db(fields=['cartons_in_stock'])
+                raise ValueError(f'Insufficient stock for {self.wholesale_item.name}. Available: {self.wholesale_item.cartons_in_stock}, Requested: {quantity}')
+            self.wholesale_item.cartons_in_stock -= quantity
+            # update() bypasses Product.save, so keep the linked retail item in step here
+            Product.sync_stock_bulk([self.wholesale_item_id])
+    
+    @classmethod
+    def bulk_create_with_stock(cls, sale, items):
+        """Insert several unsaved line items for `sale` with one stock check and update per table.
+
+        Locks the referenced StationeryItem/Product rows, validates every quantity,
+        deducts stock with a single CASE UPDATE per table and bulk-inserts the lines,
+        so a K-line checkout costs a fixed number of queries instead of K save() calls.
+        Raises ValueError (as save() does) if any item lacks stock.
+        """
+        items = list(items)
+        wanted = {'retail': {}, 'wholesale': {}}
+        for item in items:
+            item.sale = sale
+            item.total_price = item.quantity * item.unit_price
+            item_id = item.retail_item_id if item.product_type == 'retail' else item.wholesale_item_id
+            if item_id:
+                qty = wanted[item.product_type]
+                qty[item_id] = qty.get(item_id, 0) + item.quantity
+
+        with transaction.atomic():
+            for product_type, model, stock_field in (
+                ('retail', StationeryItem, 'stock_quantity'),
+                ('wholesale', Product, 'cartons_in_stock'),
+            ):
+                qty = wanted[product_type]
+                if not qty:
+                    continue
+                locked = model.objects.select_for_update().filter(pk__in=qty).only('id', 'name', stock_field)
+                for row in locked:
+                    available = getattr(row, stock_field)
+                    if available < qty[row.pk]:
+                        raise ValueError(f'Insufficient stock for {row.name}. Available: {available}, Requested: {qty[row.pk]}')
+                _apply_stock_deltas(model, stock_field, {pk: -q for pk, q in qty.items()})
+            if wanted['wholesale']:
+                # update() bypasses Product.save, so keep linked retail items in step here
+                Product.sync_stock_bulk(list(wanted['wholesale']))
+
+            created = cls.objects.bulk_create(items)
+
+            # bulk_create skips the post_save handlers: refresh totals once, and let the
+            # Sale post_save handler sync any debt
+            totals = cls.objects.filter(sale=sale).aggregate(
+                total=models.Sum('total_price'),
+                cost=models.Sum(
+                    models.F('quantity') * models.F('retail_item__cost_price'),
+                    filter=models.Q(product_type='retail'),
+                ),
+            )
+            sale.total_amount = totals['total'] or ZERO
+            sale.total_cost = totals['cost'] or ZERO
+            sale.save(update_fields=['total_amount', 'total_cost'])
+        return created
+
+    @classmethod
+    def restore_stock_bulk(cls, items):
+        """Put several lines' quantities back in stock with one CASE UPDATE per item table."""
+        deltas = {'retail': {}, 'wholesale': {}}
+        for item in items:
+            item_id = item.retail_item_id if item.product_type == 'retail' else item.wholesale_item_id
+            if item_id and item.product_type in deltas:
+                qty = deltas[item.product_type]
+                qty[item_id] = qty.get(item_id, 0) + item.quantity
+        if deltas['retail']:
+            _apply_stock_deltas(StationeryItem, 'stock_quantity', deltas['retail'])
+        if deltas['wholesale']:
+            _apply_stock_deltas(Product, 'cartons_in_stock', deltas['wholesale'])
+            # update() bypasses Product.save, so keep linked retail items in step here
+            Product.sync_stock_bulk(list(deltas['wholesale']))
+
+    def restore_stock(self):
+        """Put this line's quantity back in stock with an F() update (no read-modify-write)."""
+        if self.product_type == 'retail' and self.retail_item_id:
+            StationeryItem.objects.filter(pk=self.retail_item_id).update(
+                stock_quantity=models.F('stock_quantity') + self.quantity
+            )
+        elif self.product_type == 'wholesale' and self.wholesale_item_id:
+            Product.objects.filter(pk=self.wholesale_item_id).update(
+                cartons_in_stock=models.F('cartons_in_stock') + self.quantity
+            )
+            # update() bypasses Product.save, so keep the linked retail item in step here
+            Product.sync_stock_bulk([self.wholesale_item_id])
+
+    def delete(self, *args, **kwargs):
+        # Restore stock when sale item is deleted; the flag stops the post_delete
+        # signal from restoring it a second time
+        self.restore_stock()
+        self._stock_restored = True
         super().delete(*args, **kwargs)
 
 
+class DebtManager(models.Manager):
+    def get_queryset(self):
+        # Debt listings and __str__ read these relations on every row
+        return super().get_queryset().select_related('customer', 'item', 'sale', 'created_by')
+
+
 class Debt(models.Model):
     """Debt tracking model"""
     STATUS_CHOICES = [
@@ -483,16 +810,33 @@ class Debt(models.Model):
     item = models.ForeignKey(StationeryItem, on_delete=models.PROTECT, related_name='debts')
     quantity = models.PositiveIntegerField(default=1)
 
-    amount = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(Decimal('0.01'))])
+    amount = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(ONE_CENT)])
     paid_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
-    due_date = models.DateField()
-    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    due_date = models.DateField(db_index=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', db_index=True)
     description = models.TextField(blank=True)
+    # Set for debts created automatically from unpaid sales (see signals._sync_debt_for_sale)
+    auto_created = models.BooleanField(default=False, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = DebtManager()
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Overdue report: status != 'paid' AND due_date < today
+            models.Index(fields=['status', 'due_date'], name='debt_status_due_idx'),
+            # A customer's debts, newest first (customer detail page)
+            models.Index(fields=['customer', '-created_at'], name='debt_cust_created_idx'),
+            # Partial index over only the open debts, in due-date order, for the bulk
+            # SMS/WhatsApp reminder lists
+            models.Index(
+                fields=['due_date'],
+                condition=models.Q(status__in=['pending', 'partial', 'overdue']),
+                name='debt_open_due_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.customer.name} - TZS {self.amount:,.0f} ({self.status})"
@@ -507,14 +851,22 @@ class Debt(models.Model):
         return self.due_date < timezone.now().date() and self.status != 'paid'
 
 
+class PaymentManager(models.Manager):
+    def get_queryset(self):
+        # Payment.__str__ traverses debt.customer
+        return super().get_queryset().select_related('debt__customer')
+
+
 class Payment(models.Model):
     """Payment records for debts"""
     debt = models.ForeignKey(Debt, on_delete=models.CASCADE, related_name='payments')
-    amount = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(Decimal('0.01'))])
+    amount = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(ONE_CENT)])
     payment_date = models.DateTimeField(auto_now_add=True)
     payment_method = models.CharField(max_length=20, choices=Sale.PAYMENT_CHOICES, default='cash')
     notes = models.TextField(blank=True)
 
+    objects = PaymentManager()
+
     class Meta:
         ordering = ['-payment_date']
 
@@ -522,15 +874,21 @@ class Payment(models.Model):
         return f"Payment of TZS {self.amount:,.0f} for {self.debt.customer.name}"
 
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        # Update debt status
-        self.debt.paid_amount += self.amount
-        if self.debt.paid_amount >= self.debt.amount:
-            self.debt.status = 'paid'
-        elif self.debt.paid_amount > 0:
-            self.debt.status = 'partial'
-        # Use update_fields to avoid triggering unnecessary signals/cascades
-        self.debt.save(update_fields=['paid_amount', 'status'])
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            # Update debt paid_amount and status in one UPDATE, computed by the database
+            # from the current row so concurrent payments can't overwrite each other.
+            # status is listed first so it is derived from the pre-increment paid_amount
+            # on every backend (MySQL evaluates SET assignments left to right).
+            new_paid = models.F('paid_amount') + self.amount
+            Debt.objects.filter(pk=self.debt_id).update(
+                status=models.Case(
+                    models.When(models.lookups.GreaterThanOrEqual(new_paid, models.F('amount')), then=models.Value('paid')),
+                    models.When(models.lookups.GreaterThan(new_paid, 0), then=models.Value('partial')),
+                    default=models.F('status'),
+                ),
+                paid_amount=new_paid,
+            )
 
 
 class Expenditure(models.Model):
@@ -546,8 +904,8 @@ class Expenditure(models.Model):
 
     category = models.CharField(max_length=50, choices=CATEGORY_CHOICES, default='other')
     description = models.TextField(blank=True)
-    amount = models.DecimalField(max_digits=12, decimal_places=2, validators=[MinValueValidator(Decimal('0.01'))])
-    expense_date = models.DateTimeField(default=timezone.now)
+    amount = models.DecimalField(max_digits=12, decimal_places=2, validators=[MinValueValidator(ONE_CENT)])
+    expense_date = models.DateTimeField(default=timezone.now, db_index=True)
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -556,3 +914,40 @@ class Expenditure(models.Model):
 
     def __str__(self):
         return f"{self.get_category_display()} - TZS {self.amount:,.0f} on {self.expense_date.date()}"
+
+
+class SaleDailySummary(models.Model):
+    """Paid sales totalled per local day, kept up to date by signals.py for the sales chart."""
+    day = models.DateField(unique=True)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['day']
+
+    def __str__(self):
+        return f"{self.day}: TZS {self.total:,.0f} ({self.count} sales)"
+
+    @classmethod
+    def refresh(cls, days=None):
+        """Recompute the rows for the given local dates from Sale, or every row if days is None."""
+        sales = Sale.objects.filter(is_paid=True)
+        if days is not None:
+            days = list(days)
+            sales = sales.filter(sale_date__date__in=days)
+        rows = (
+            sales.annotate(day=TruncDate('sale_date'))
+            .values('day')
+            .annotate(total=models.Sum('total_amount'), count=models.Count('id'))
+            .order_by()
+        )
+        summaries = [cls(day=row['day'], total=row['total'] or ZERO, count=row['count']) for row in rows]
+        with transaction.atomic():
+            # Days left without paid sales drop out of the summary
+            stale = cls.objects.exclude(day__in=[summary.day for summary in summaries])
+            if days is not None:
+                stale = stale.filter(day__in=days)
+            stale.delete()
+            cls.objects.bulk_create(
+                summaries, update_conflicts=True, unique_fields=['day'], update_fields=['total', 'count'],
+            )
@@ -0,0 +1,128 @@
+"""Pagination helpers for the long listings.
+
+OFFSET pagination makes the database walk and discard every skipped row, so deep
+pages get slower as a table grows. PkSlicePaginator keeps numbered pages but only
+skips over narrow pk rows; a keyset page instead asks for the rows that sort after
+the last row already shown, which an index on the ordering columns can seek to
+directly and which needs no COUNT(*).
+"""
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+
+
+class PkSlicePaginator(Paginator):
+    """Paginator that applies LIMIT/OFFSET to a narrow pk-only subquery.
+
+    The database skips rows on the pk (index-only where possible) and only builds the
+    wide rows -- joins, annotations, prefetches -- for the page actually shown.
+
+    Views that already aggregate the row count can pass it as `count` to skip the
+    paginator's own COUNT(*).
+    """
+
+    def __init__(self, object_list, per_page, *args, count=None, **kwargs):
+        super().__init__(object_list, per_page, *args, **kwargs)
+        if count is not None:
+            # Paginator.count is a cached_property: seed its cache
+            self.__dict__['count'] = count
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        if top + self.orphans >= self.count:
+            top = self.count
+        object_list = self.object_list.filter(pk__in=self.object_list.values('pk')[bottom:top])
+        return self._get_page(object_list, number, self)
+
+
+class KeysetPage:
+    """A page reached through a cursor; offers the parts of Page the list templates use."""
+    is_keyset = True
+    number = None
+    paginator = None
+
+    def __init__(self, object_list, next_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        # A cursor always points past at least one earlier page
+        return True
+
+    def has_other_pages(self):
+        return True
+
+
+def encode_cursor(obj, ordering):
+    """Return an opaque cursor for the rows that sort after `obj` under `ordering`."""
+    opts = obj._meta
+    values = [opts.get_field(name.lstrip('-')).value_to_string(obj) for name in ordering]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(model, ordering, cursor):
+    """Return the ordering values stored in `cursor`, or None if it is missing or invalid."""
+    if not cursor:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(ordering):
+            return None
+        return [
+            model._meta.get_field(name.lstrip('-')).to_python(value)
+            for name, value in zip(ordering, values)
+        ]
+    except (ValueError, TypeError, ValidationError, binascii.Error):
+        return None
+
+
+def _after(ordering, values):
+    """Q for rows sorting strictly after `values`: (a > x) OR (a = x AND b > y) ..."""
+    condition = Q()
+    equal = Q()
+    for name, value in zip(ordering, values):
+        field = name.lstrip('-')
+        lookup = 'lt' if name.startswith('-') else 'gt'
+        condition |= equal & Q(**{f'{field}__{lookup}': value})
+        equal &= Q(**{field: value})
+    return condition
+
+
+def keyset_page(queryset, ordering, cursor, per_page):
+    """Return the KeysetPage after `cursor`, or None if the cursor is missing or invalid.
+
+    `ordering` must be a total order (end with the pk) so no row is skipped or repeated.
+    """
+    values = decode_cursor(queryset.model, ordering, cursor)
+    if values is None:
+        return None
+    # One extra row tells us whether there is a next page without a COUNT(*)
+    rows = list(queryset.order_by(*ordering).filter(_after(ordering, values))[:per_page + 1])
+    next_cursor = encode_cursor(rows[per_page - 1], ordering) if len(rows) > per_page else None
+    return KeysetPage(rows[:per_page], next_cursor)
+
+
+def next_cursor_for(page, ordering):
+    """Cursor continuing after a numbered Paginator page, so "Next" never needs an OFFSET."""
+    if not page.has_next():
+        return None
+    rows = list(page.object_list)
+    return encode_cursor(rows[-1], ordering) if rows else None
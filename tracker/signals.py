@@ -1,11 +1,80 @@
 """Django signals for stock management.
 Use post_delete on SaleItem as a reliable backup for bulk deletes.
 """
-from django.db.models.signals import post_delete, post_save
+import threading
+
+from django.core.signals import request_finished
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
-from django.db.models import Sum
+from django.utils import timezone
+from django.core.cache import cache
+from django.db.models import DecimalField, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
 from decimal import Decimal
-from .models import SaleItem, Sale, Category
+from .caching import bump_catalog_version, bump_dashboard_version, forget_active_customers
+from .models import SaleItem, Sale, Category, StationeryItem, Product, Supplier, Debt, Payment, Expenditure, Customer, SaleDailySummary
+from .forms import UNIT_PRICES_CACHE_KEY
+
+
+# Fields whose change can affect a sale's auto-created debt
+DEBT_SYNC_FIELDS = frozenset({'customer', 'total_amount', 'is_paid', 'paid_debt', 'sale_date'})
+
+# Per-process cache of the MISC-DEBT placeholder item's pk (see _get_misc_debt_item_id)
+_MISC_DEBT_ITEM_ID = None
+
+
+def _get_misc_debt_item_id():
+    """Return the pk of the placeholder item for debts without sale lines, creating it once."""
+    global _MISC_DEBT_ITEM_ID
+    if _MISC_DEBT_ITEM_ID is None:
+        _MISC_DEBT_ITEM_ID = StationeryItem.objects.get_or_create(
+            sku='MISC-DEBT',
+            defaults={
+                'name': 'Miscellaneous Debt',
+                'category': Category.objects.first() or None,
+                'unit_price': Decimal('0.01'),
+                'cost_price': Decimal('0.01'),
+                'stock_quantity': 0,
+            }
+        )[0].pk
+    return _MISC_DEBT_ITEM_ID
+
+
+def _sale_due_date(sale):
+    """Due date for an auto-created debt: seven days after the sale's local date."""
+    from datetime import timedelta
+    from django.utils import timezone
+
+    # Use the sale's local date (converted via timezone.localtime) as the base for due_date so it
+    # matches the date users expect in their configured timezone and avoids off-by-one errors.
+    if getattr(sale, 'sale_date', None):
+        try:
+            sale_local_date = timezone.localtime(sale.sale_date).date()
+        except Exception:
+            # If for any reason localtime conversion fails, fall back to the naive date
+            sale_local_date = sale.sale_date.date()
+        return sale_local_date + timedelta(days=7)
+    return timezone.now().date() + timedelta(days=7)
+
+
+def _first_debt_line(sale):
+    """Return (item_id, quantity) for an auto-created debt, from the sale's first line."""
+    first = (
+        SaleItem.objects.filter(sale=sale)
+        .select_related('wholesale_item')
+        .only('product_type', 'quantity', 'retail_item_id', 'wholesale_item__stationery_item_id')
+        .order_by('pk')
+        .first()
+    )
+    if first is not None:
+        # Debt.item points at StationeryItem: wholesale lines use their linked retail item
+        if first.product_type == 'retail' and first.retail_item_id:
+            return first.retail_item_id, first.quantity
+        if first.wholesale_item_id and first.wholesale_item.stationery_item_id:
+            return first.wholesale_item.stationery_item_id, first.quantity
+    # Reuse a generic placeholder item for non-item-specific debts
+    return _get_misc_debt_item_id(), 1
 
 
 def _sync_debt_for_sale(sale):
@@ -16,132 +85,188 @@ def _sync_debt_for_sale(sale):
     - If sale becomes paid, mark any linked Debt as paid and set paid_amount to amount.
     - If sale has no customer or total_amount is 0, remove any auto-created debt for this sale.
     """
-    from datetime import timedelta
-    from django.utils import timezone
-
     # Import Debt model lazily to avoid circular import issues
     from .models import Debt
 
-    if sale.customer is None or sale.total_amount <= Decimal('0'):
+    if sale.customer_id is None or sale.total_amount <= Decimal('0'):
         # If no customer or zero amount, remove auto-created debt if present
-        try:
-            d = Debt.objects.filter(sale=sale)
-            # Only delete debts that we created (heuristic: description contains 'Auto-created')
-            d = d.filter(description__icontains='Auto-created')
-            if d.exists():
-                d.delete()
-        except Debt.DoesNotExist:
-            pass
+        # Only delete debts that we created
+        Debt.objects.filter(sale=sale, auto_created=True).delete()
+        return
+
+    if sale.is_paid and sale.paid_debt_id:
+        # Payment sales are linked to the debt they paid; its status is handled by the
+        # Payment model's save method
         return
 
+    # One lookup for the linked debt; every branch below works from this instance
+    d = Debt.objects.select_related(None).filter(sale=sale).first()
+
     if sale.is_paid:
-        # Mark any linked debt as paid, but ONLY if this is not a payment sale
-        # Payment sales have notes like 'Payment for Debt #<id>'
-        if sale.notes and 'Payment for Debt #' in sale.notes:
-            # This is a payment sale, don't auto-update the debt status
-            # The debt status is handled by the Payment model's save method
-            return
-        
         # This is a regular sale being marked as paid, update the debt
-        try:
-            d = Debt.objects.filter(sale=sale).first()
-            if d:
-                d.paid_amount = d.amount
-                d.status = 'paid'
-                d.save()
-        except Debt.DoesNotExist:
-            pass
+        if d and (d.paid_amount != d.amount or d.status != 'paid'):
+            d.paid_amount = d.amount
+            d.status = 'paid'
+            d.save(update_fields=['paid_amount', 'status', 'updated_at'])
         return
 
     # At this point sale is unpaid, has customer and positive total -> ensure debt exists/updated
-    # Use the sale's local date (converted via timezone.localtime) as the base for due_date so it
-    # matches the date users expect in their configured timezone and avoids off-by-one errors.
-    if getattr(sale, 'sale_date', None):
-        try:
-            sale_local_date = timezone.localtime(sale.sale_date).date()
-        except Exception:
-            # If for any reason localtime conversion fails, fall back to the naive date
-            sale_local_date = sale.sale_date.date()
-        due_date = sale_local_date + timedelta(days=7)
-    else:
-        due_date = (timezone.now().date() + timedelta(days=7))
-
-    # Determine a sensible item/quantity for the auto-created debt
-    from .models import StationeryItem, SaleItem
-    sale_first_item = SaleItem.objects.filter(sale=sale).order_by('pk').first()
-    if sale_first_item:
-        default_item = sale_first_item.item
-        default_qty = sale_first_item.quantity
-    else:
-        # Create or reuse a generic placeholder item for non-item-specific debts
-        default_item, _ = StationeryItem.objects.get_or_create(
-            sku='MISC-DEBT',
+    due_date = _sale_due_date(sale)
+
+    if d is None:
+        default_item_id, default_qty = _first_debt_line(sale)
+        Debt.objects.get_or_create(
+            sale=sale,
             defaults={
-                'name': 'Miscellaneous Debt',
-                'category': Category.objects.first() or None,
-                'unit_price': Decimal('0.01'),
-                'cost_price': Decimal('0.01'),
-                'stock_quantity': 0,
+                'customer_id': sale.customer_id,
+                'item_id': default_item_id,
+                'quantity': default_qty,
+                'amount': sale.total_amount,
+                'paid_amount': Decimal('0'),
+                'due_date': due_date,
+                'status': 'pending',
+                'description': f'Auto-created from sale #{sale.pk}',
+                'auto_created': True,
             }
         )
-        default_qty = 1
-
-    d, created = Debt.objects.get_or_create(
-        sale=sale,
-        defaults={
-            'customer': sale.customer,
-            'item': default_item,
-            'quantity': default_qty,
-            'amount': sale.total_amount,
-            'paid_amount': Decimal('0'),
-            'due_date': due_date,
-            'status': 'pending',
-            'description': f'Auto-created from sale #{sale.pk}'
-        }
+        return
+
+    # Update amount/status as needed without overwriting paid_amount
+    changed = {'customer_id': sale.customer_id, 'amount': sale.total_amount}
+    if d.paid_amount >= sale.total_amount:
+        changed['status'] = 'paid'
+    elif d.paid_amount > 0:
+        changed['status'] = 'partial'
+    else:
+        changed['status'] = 'pending'
+    # If this debt was auto-created originally, keep due_date aligned with the sale date
+    if d.auto_created:
+        changed['due_date'] = due_date
+
+    update_fields = [name for name, value in changed.items() if getattr(d, name) != value]
+    if update_fields:
+        for name in update_fields:
+            setattr(d, name, changed[name])
+        d.save(update_fields=[name.removesuffix('_id') for name in update_fields] + ['updated_at'])
+
+
+# Sales touched in the current transaction; totals and debts are recomputed once per
+# sale after commit, off the critical section, instead of once per save
+_pending = threading.local()
+
+
+def _pending_sale_ids():
+    """Sales whose SaleItems changed: totals and debt need refreshing."""
+    if not hasattr(_pending, 'sale_ids'):
+        _pending.sale_ids = set()
+    return _pending.sale_ids
+
+
+def _pending_debt_sale_ids():
+    """Sales saved directly: only the debt needs syncing."""
+    if not hasattr(_pending, 'debt_sale_ids'):
+        _pending.debt_sale_ids = set()
+    return _pending.debt_sale_ids
+
+
+def _pending_summary_days():
+    """Local dates whose SaleDailySummary row needs recomputing."""
+    if not hasattr(_pending, 'summary_days'):
+        _pending.summary_days = set()
+    return _pending.summary_days
+
+
+def _pending_cache_bumps():
+    """Cache invalidations (functions from caching.py) waiting for the transaction to commit."""
+    if not hasattr(_pending, 'cache_bumps'):
+        _pending.cache_bumps = set()
+    return _pending.cache_bumps
+
+
+def _schedule_cache_bump(bump):
+    _pending_cache_bumps().add(bump)
+    # Registered per change, but the first callback to run empties the set, so each
+    # cache is invalidated once per transaction however many rows it touched
+    transaction.on_commit(_flush_cache_bumps)
+
+
+def _flush_cache_bumps():
+    bumps = _pending_cache_bumps()
+    while bumps:
+        bumps.pop()()
+
+
+def _schedule_sale_refresh(sale_id):
+    _pending_sale_ids().add(sale_id)
+    # Runs immediately in autocommit mode, or once the outermost atomic block commits
+    transaction.on_commit(_flush_pending_sales)
+
+
+def _schedule_debt_sync(sale_id):
+    _pending_debt_sale_ids().add(sale_id)
+    transaction.on_commit(_flush_pending_sales)
+
+
+def _schedule_summary_day(sale):
+    _pending_summary_days().add(timezone.localtime(sale.sale_date).date())
+    transaction.on_commit(_flush_pending_sales)
+
+
+def _refresh_sale_totals(sale_ids):
+    """Recompute Sale.total_amount and the denormalised Sale.total_cost with one UPDATE."""
+    lines = SaleItem.objects.filter(sale=OuterRef('pk')).order_by().values('sale')
+    money = DecimalField(max_digits=12, decimal_places=2)
+    Sale.objects.filter(pk__in=sale_ids).update(
+        total_amount=Coalesce(
+            Subquery(lines.annotate(t=Sum('total_price')).values('t'), output_field=money),
+            Decimal('0'),
+        ),
+        # Cost of goods sold: only retail lines carry a cost price (matches Sale.profit)
+        total_cost=Coalesce(
+            Subquery(
+                lines.annotate(
+                    c=Sum(F('quantity') * F('retail_item__cost_price'), filter=Q(product_type='retail'))
+                ).values('c'),
+                output_field=money,
+            ),
+            Decimal('0'),
+        ),
     )
-    if not created:
-        # Update amount/status as needed without overwriting paid_amount
-        d.customer = sale.customer
-        d.amount = sale.total_amount
-        # Ensure an item is present for older records
-        if not d.item:
-            if sale_first_item:
-                d.item = sale_first_item.item
-                d.quantity = sale_first_item.quantity
-            else:
-                d.item = default_item
-                if not d.quantity:
-                    d.quantity = default_qty
-        if d.paid_amount >= d.amount:
-            d.status = 'paid'
-        elif d.paid_amount > 0:
-            d.status = 'partial'
-        else:
-            d.status = 'pending'
-        # If this debt was auto-created originally, keep due_date aligned with the sale date
-        if d.description and 'Auto-created' in d.description:
-            # Recompute based on local sale_date to remain consistent
-            if getattr(sale, 'sale_date', None):
-                try:
-                    sale_local_date = timezone.localtime(sale.sale_date).date()
-                except Exception:
-                    sale_local_date = sale.sale_date.date()
-                d.due_date = sale_local_date + timedelta(days=7)
-        d.save()
+
+
+def _flush_pending_sales(**kwargs):
+    sale_ids = _pending_sale_ids()
+    debt_sale_ids = _pending_debt_sale_ids()
+    summary_days = _pending_summary_days()
+    if sale_ids or debt_sale_ids:
+        ids = list(sale_ids | debt_sale_ids)
+        refreshed = set(sale_ids)
+        if sale_ids:
+            # Use update to avoid triggering save() side-effects on Sale
+            _refresh_sale_totals(list(sale_ids))
+        sale_ids.clear()
+        debt_sale_ids.clear()
+        # Sales deleted in the meantime (e.g. cascades) simply drop out here
+        sales = (
+            Sale.objects.select_related(None)
+            .only('pk', 'customer_id', 'total_amount', 'is_paid', 'paid_debt', 'sale_date')
+            .filter(pk__in=ids)
+        )
+        for sale in sales:
+            if sale.pk in refreshed:
+                # New totals move that day's chart figures
+                summary_days.add(timezone.localtime(sale.sale_date).date())
+            _sync_debt_for_sale(sale)
+    if summary_days:
+        days = list(summary_days)
+        summary_days.clear()
+        SaleDailySummary.refresh(days)
 
 
 @receiver(post_save, sender=SaleItem)
 def update_sale_total_on_save(sender, instance, **kwargs):
-    """Recompute the parent Sale.total_amount whenever a SaleItem is saved."""
-    total = SaleItem.objects.filter(sale=instance.sale).aggregate(total=Sum('total_price'))['total'] or Decimal('0')
-    # Use update to avoid triggering save() side-effects on Sale
-    Sale.objects.filter(pk=instance.sale.pk).update(total_amount=total)
-    # Fetch the up-to-date Sale instance and sync debts
-    try:
-        sale = Sale.objects.get(pk=instance.sale.pk)
-        _sync_debt_for_sale(sale)
-    except Sale.DoesNotExist:
-        pass
+    """Queue the parent Sale for a totals/debt refresh whenever a SaleItem is saved."""
+    _schedule_sale_refresh(instance.sale_id)
 
 
 @receiver(post_delete, sender=SaleItem)
@@ -151,38 +276,128 @@ def restore_stock_on_sale_item_delete(sender, instance, **kwargs):
     This ensures stock is restored for bulk deletes where model.delete()
     may not be called. If the model's delete() already restored stock,
     it sets `instance._stock_restored = True` and this handler will skip.
-    Additionally, recompute the parent Sale.total_amount to reflect deletion.
+    Additionally, queue the parent Sale so its totals reflect the deletion.
     """
-    if getattr(instance, '_stock_restored', False):
-        # Stock was already restored in the model's delete; continue to adjust totals
-        pass
-    else:
+    # Lines of a sale being deleted were already restored in bulk (pre_delete on Sale)
+    if not getattr(instance, '_stock_restored', False) and instance.sale_id not in _stock_restored_sales():
         # Restore stock based on product type
-        if instance.product_type == 'retail' and instance.retail_item:
-            instance.retail_item.stock_quantity += instance.quantity
-            instance.retail_item.save(update_fields=['stock_quantity'])
-        elif instance.product_type == 'wholesale' and instance.wholesale_item:
-            instance.wholesale_item.cartons_in_stock += instance.quantity
-            instance.wholesale_item.save(update_fields=['cartons_in_stock'])
-
-    # Recompute the sale total if the sale still exists (it may be being deleted)
-    try:
-        total = SaleItem.objects.filter(sale=instance.sale).aggregate(total=Sum('total_price'))['total'] or Decimal('0')
-        Sale.objects.filter(pk=instance.sale.pk).update(total_amount=total)
-        # Sync debts after updating total
-        try:
-            sale = Sale.objects.get(pk=instance.sale.pk)
-            _sync_debt_for_sale(sale)
-        except Sale.DoesNotExist:
-            # If sale was deleted as part of cascade, nothing to update
-            pass
-    except Sale.DoesNotExist:
-        # If sale was deleted as part of cascade, nothing to update
-        pass
+        instance.restore_stock()
+
+    _schedule_sale_refresh(instance.sale_id)
+
+
+def _stock_restored_sales():
+    """Sale pks whose lines had their stock restored in bulk ahead of a cascade delete."""
+    if not hasattr(_pending, 'stock_restored'):
+        _pending.stock_restored = set()
+    return _pending.stock_restored
+
+
+@receiver(pre_delete, sender=Sale)
+def restore_stock_on_sale_delete(sender, instance, **kwargs):
+    """Restore stock for all of a sale's lines in one UPDATE per item table before they cascade."""
+    SaleItem.restore_stock_bulk(
+        SaleItem.objects.filter(sale=instance).only('product_type', 'retail_item', 'wholesale_item', 'quantity')
+    )
+    _stock_restored_sales().add(instance.pk)
+
+
+@receiver(post_delete, sender=Sale)
+def clear_stock_restored_on_sale_delete(sender, instance, **kwargs):
+    # Lines are deleted before their sale, so the marker is no longer needed
+    _stock_restored_sales().discard(instance.pk)
+
+
+@receiver(request_finished)
+def flush_pending_sales_on_request_finished(sender, **kwargs):
+    """Backstop: refresh any sales left by a rolled-back transaction."""
+    _flush_pending_sales()
+    _stock_restored_sales().clear()
+    # Left only by a rolled-back transaction, which changed nothing to invalidate
+    _pending_cache_bumps().clear()
 
 
 @receiver(post_save, sender=Sale)
 def sync_debt_on_sale_save(sender, instance, created, **kwargs):
     """Keep debts in sync when a Sale instance is saved (e.g., payment status changes)."""
-    _sync_debt_for_sale(instance)
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and not DEBT_SYNC_FIELDS.intersection(update_fields):
+        return
+    if not created:
+        # Instances loaded from the DB remember their debt inputs (Sale.from_db);
+        # a save that left them untouched can't change the debt
+        state = instance.debt_state()
+        if getattr(instance, '_loaded_debt_state', None) == state:
+            return
+        instance._loaded_debt_state = state
+    # Synced from the committed row once the transaction ends, with any SaleItem changes
+    _schedule_debt_sync(instance.pk)
+
+
+@receiver(post_delete, sender=StationeryItem)
+def reset_misc_debt_item_cache(sender, instance, **kwargs):
+    """Forget the cached MISC-DEBT item if it is deleted, so it is recreated on next use."""
+    global _MISC_DEBT_ITEM_ID
+    if instance.pk == _MISC_DEBT_ITEM_ID or instance.sku == 'MISC-DEBT':
+        _MISC_DEBT_ITEM_ID = None
+
+
+@receiver(post_save, sender=StationeryItem)
+@receiver(post_delete, sender=StationeryItem)
+def invalidate_unit_prices_cache(sender, **kwargs):
+    """Drop the cached DebtForm unit prices whenever an item changes."""
+    cache.delete(UNIT_PRICES_CACHE_KEY)
+
 
+@receiver(post_save, sender=StationeryItem)
+@receiver(post_delete, sender=StationeryItem)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Supplier)
+@receiver(post_delete, sender=Supplier)
+@receiver(post_save, sender=Sale)
+@receiver(post_delete, sender=Sale)
+@receiver(post_save, sender=SaleItem)
+@receiver(post_delete, sender=SaleItem)
+def invalidate_catalog_stats(sender, **kwargs):
+    """Drop the cached list aggregates when items change or sales move stock.
+
+    Deferred to commit so a concurrent request can't re-cache pre-commit figures.
+    """
+    _schedule_cache_bump(bump_catalog_version)
+
+
+@receiver(post_save, sender=Sale)
+@receiver(post_delete, sender=Sale)
+@receiver(post_save, sender=SaleItem)
+@receiver(post_delete, sender=SaleItem)
+@receiver(post_save, sender=Debt)
+@receiver(post_delete, sender=Debt)
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Payment)
+@receiver(post_save, sender=Expenditure)
+@receiver(post_delete, sender=Expenditure)
+@receiver(post_save, sender=StationeryItem)
+@receiver(post_delete, sender=StationeryItem)
+@receiver(post_save, sender=Customer)
+@receiver(post_delete, sender=Customer)
+def invalidate_dashboard(sender, **kwargs):
+    """Drop the cached dashboard figures once a change to what it shows commits."""
+    # Once per transaction, however many sale lines or stock rows it saved
+    _schedule_cache_bump(bump_dashboard_version)
+
+
+@receiver(post_save, sender=Customer)
+@receiver(post_delete, sender=Customer)
+def invalidate_active_customers(sender, **kwargs):
+    """Drop the cached customer dropdown once a customer change commits."""
+    _schedule_cache_bump(forget_active_customers)
+
+
+@receiver(post_save, sender=Sale)
+@receiver(post_delete, sender=Sale)
+def refresh_daily_summary_on_sale_change(sender, instance, **kwargs):
+    """Recompute the sale's day in SaleDailySummary once the change commits."""
+    _schedule_summary_day(instance)
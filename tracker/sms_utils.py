@@ -1,21 +1,40 @@
 import africastalking
+from concurrent.futures import ThreadPoolExecutor
 from django.conf import settings
 from django.core.exceptions import ValidationError
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
+# Gateway requests send_bulk_sms keeps in flight at once; each is an I/O-bound HTTP call
+SMS_SEND_WORKERS = 8
+
+# SMS service from the first successful initialization, reused for every send in this process
+_sms_client = None
+# africastalking.initialize mutates SDK globals: only one thread may run it
+_sms_client_lock = threading.Lock()
+
+
 def initialize_africastalking():
-    """Initialize Africa's Talking SDK"""
-    try:
-        africastalking.initialize(
-            username=settings.AFRICASTALKING_USERNAME,
-            api_key=settings.AFRICASTALKING_API_KEY
-        )
-        return africastalking.SMS
-    except Exception as e:
-        logger.error(f"Failed to initialize Africa's Talking: {e}")
-        return None
+    """Initialize Africa's Talking SDK (once per process; failures are retried on the next call)"""
+    global _sms_client
+    if _sms_client is not None:
+        return _sms_client
+    with _sms_client_lock:
+        # Another thread may have finished initializing while we waited
+        if _sms_client is not None:
+            return _sms_client
+        try:
+            africastalking.initialize(
+                username=settings.AFRICASTALKING_USERNAME,
+                api_key=settings.AFRICASTALKING_API_KEY
+            )
+            _sms_client = africastalking.SMS
+            return _sms_client
+        except Exception as e:
+            logger.error(f"Failed to initialize Africa's Talking: {e}")
+            return None
 
 def initialize_whatsapp():
     """Initialize Africa's Talking WhatsApp SDK"""
@@ -25,6 +44,20 @@ def initialize_whatsapp():
     logger.warning("To use WhatsApp, you need to set up WhatsApp Business API separately")
     return None
 
+# Leading character -> rewrite into international format; anything else just gains a '+'
+_MSISDN_PREFIXES = {
+    '+': lambda phone: phone,
+    # Assume Tanzanian number if no country code
+    '0': lambda phone: '+255' + phone[1:],
+}
+
+def _add_plus(phone):
+    return '+' + phone
+
+def _normalize_msisdn(phone_number):
+    """Return the phone number in international format (+XXXXXXXXXXXX)"""
+    return _MSISDN_PREFIXES.get(phone_number[:1], _add_plus)(phone_number)
+
 def send_sms(phone_number, message):
     """
     Send SMS using Africa's Talking
@@ -44,13 +77,7 @@ def send_sms(phone_number, message):
         }
 
     try:
-        # Ensure phone number starts with +
-        if not phone_number.startswith('+'):
-            # Assume Tanzanian number if no country code
-            if phone_number.startswith('0'):
-                phone_number = '+255' + phone_number[1:]
-            else:
-                phone_number = '+' + phone_number
+        phone_number = _normalize_msisdn(phone_number)
 
         response = sms.send(
             message=message,
@@ -73,6 +100,67 @@ def send_sms(phone_number, message):
             'error': str(e)
         }
 
+def send_bulk_sms(pairs):
+    """
+    Send several SMS, making one API call per distinct message body
+
+    Args:
+        pairs (list): (phone_number, message) tuples
+
+    Returns:
+        list: One result dict per pair, in the same order (same shape as send_sms)
+    """
+    sms = initialize_africastalking()
+    if not sms:
+        return [{'success': False, 'error': 'SMS service not configured properly'} for _ in pairs]
+
+    # Recipients sharing an identical message go out in a single request
+    groups = {}
+    for index, (phone_number, message) in enumerate(pairs):
+        groups.setdefault(message, []).append((index, _normalize_msisdn(phone_number)))
+
+    results = [None] * len(pairs)
+
+    def send_group(message, members):
+        # Each group writes only its own members' slots in results
+        recipients = [number for _, number in members]
+        try:
+            response = sms.send(
+                message=message,
+                recipients=recipients,
+                sender_id=settings.AFRICASTALKING_SENDER_ID
+            )
+        except Exception as e:
+            logger.error(f"Failed to send SMS to {', '.join(recipients)}: {e}")
+            for index, number in members:
+                results[index] = {'success': False, 'error': str(e)}
+            return
+
+        logger.info(f"SMS sent to {', '.join(recipients)}: {response}")
+        # Per-recipient delivery status, when the API reports one
+        statuses = {}
+        if isinstance(response, dict):
+            for recipient in response.get('SMSMessageData', {}).get('Recipients', []):
+                statuses[recipient.get('number')] = recipient.get('status')
+        for index, number in members:
+            status = statuses.get(number, 'Success')
+            if status == 'Success':
+                results[index] = {'success': True, 'response': response, 'recipient': number}
+            else:
+                results[index] = {'success': False, 'error': status, 'recipient': number}
+
+    if len(groups) <= 1:
+        for message, members in groups.items():
+            send_group(message, members)
+        return results
+
+    # Reminder texts are mostly personalised, so there is usually one request per debt:
+    # overlap their network round trips instead of waiting on each in turn
+    with ThreadPoolExecutor(max_workers=min(SMS_SEND_WORKERS, len(groups))) as executor:
+        for future in [executor.submit(send_group, message, members) for message, members in groups.items()]:
+            future.result()
+    return results
+
 def send_whatsapp(phone_number, message):
     """
     Send WhatsApp message - Currently not available through Africa's Talking Python SDK
@@ -93,6 +181,57 @@ def send_whatsapp(phone_number, message):
                 "Africa's Talking dashboard or use a third-party WhatsApp service like Twilio."
     }
 
+# Reminder texts by debt status; anything not listed uses the pending text.
+# {figure} is the paid amount for settled debts and the remaining balance otherwise.
+_SMS_TEMPLATES = {
+    'paid': "Habari {name}, deni lako la TZS {figure} limekwisha lipwa. Asante kwa kufanya biashara nasi.",
+    'overdue': "Habari {name}, deni lako la TZS {figure} lilikwisha muda wake tarehe {due_date}. Tafadhali lipa haraka ili tusiwe na shida.",
+}
+_SMS_TEMPLATE_PENDING = "Habari {name}, una deni la TZS {figure} linalotakiwa kulipwa kabla ya {due_date}. Tafadhali lipa kwa wakati."
+
+_WHATSAPP_TEMPLATES = {
+    'paid': "🔔 *Habari {name}*\n\n✅ Deni lako la *TZS {figure}* limekwisha lipwa.\n\nAsante kwa kufanya biashara nasi! 🙏",
+    'overdue': "🚨 *Habari {name}*\n\n⚠️ Deni lako la *TZS {figure}* lilikwisha muda wake tarehe {due_date}.\n\nTafadhali lipa haraka ili tusiwe na shida. 🏦",
+}
+_WHATSAPP_TEMPLATE_PENDING = "💰 *Habari {name}*\n\nUna deni la *TZS {figure}* linalotakiwa kulipwa kabla ya {due_date}.\n\nTafadhali lipa kwa wakati. ⏰"
+
+def _reminder_fields(debt):
+    """Format the values shared by the SMS and WhatsApp reminder texts once"""
+    figure = debt.amount if debt.status == 'paid' else debt.remaining_amount
+    return {
+        'name': debt.customer.name,
+        'figure': format(figure, ',.0f'),
+        'due_date': debt.due_date.strftime('%d/%m/%Y'),
+    }
+
+def debt_reminder_sms_message(debt, fields=None):
+    """
+    Build the debt reminder SMS text for a customer
+
+    Args:
+        debt: Debt instance
+        fields (dict): Optional pre-formatted values from _reminder_fields
+
+    Returns:
+        str: SMS message content
+    """
+    template = _SMS_TEMPLATES.get(debt.status, _SMS_TEMPLATE_PENDING)
+    return template.format_map(fields or _reminder_fields(debt))
+
+def debt_reminder_whatsapp_message(debt, fields=None):
+    """
+    Build the debt reminder WhatsApp text for a customer
+
+    Args:
+        debt: Debt instance
+        fields (dict): Optional pre-formatted values from _reminder_fields
+
+    Returns:
+        str: WhatsApp message content
+    """
+    template = _WHATSAPP_TEMPLATES.get(debt.status, _WHATSAPP_TEMPLATE_PENDING)
+    return template.format_map(fields or _reminder_fields(debt))
+
 def send_debt_reminder_sms(debt):
     """
     Send debt reminder SMS to customer
@@ -109,19 +248,7 @@ def send_debt_reminder_sms(debt):
             'error': 'Customer has no phone number'
         }
 
-    customer_name = debt.customer.name
-    amount = debt.amount
-    due_date = debt.due_date.strftime('%d/%m/%Y')
-    remaining = debt.remaining_amount
-
-    if debt.status == 'paid':
-        message = f"Habari {customer_name}, deni lako la TZS {amount:,.0f} limekwisha lipwa. Asante kwa kufanya biashara nasi."
-    elif debt.status == 'overdue':
-        message = f"Habari {customer_name}, deni lako la TZS {remaining:,.0f} lilikwisha muda wake tarehe {due_date}. Tafadhali lipa haraka ili tusiwe na shida."
-    else:
-        message = f"Habari {customer_name}, una deni la TZS {remaining:,.0f} linalotakiwa kulipwa kabla ya {due_date}. Tafadhali lipa kwa wakati."
-
-    return send_sms(debt.customer.phone, message)
+    return send_sms(debt.customer.phone, debt_reminder_sms_message(debt))
 
 def send_debt_reminder_whatsapp(debt):
     """
@@ -139,16 +266,4 @@ def send_debt_reminder_whatsapp(debt):
             'error': 'Customer has no phone number'
         }
 
-    customer_name = debt.customer.name
-    amount = debt.amount
-    due_date = debt.due_date.strftime('%d/%m/%Y')
-    remaining = debt.remaining_amount
-
-    if debt.status == 'paid':
-        message = f"🔔 *Habari {customer_name}*\n\n✅ Deni lako la *TZS {amount:,.0f}* limekwisha lipwa.\n\nAsante kwa kufanya biashara nasi! 🙏"
-    elif debt.status == 'overdue':
-        message = f"🚨 *Habari {customer_name}*\n\n⚠️ Deni lako la *TZS {remaining:,.0f}* lilikwisha muda wake tarehe {due_date}.\n\nTafadhali lipa haraka ili tusiwe na shida. 🏦"
-    else:
-        message = f"💰 *Habari {customer_name}*\n\nUna deni la *TZS {remaining:,.0f}* linalotakiwa kulipwa kabla ya {due_date}.\n\nTafadhali lipa kwa wakati. ⏰"
-
-    return send_whatsapp(debt.customer.phone, message)
\ No newline at end of file
+    return send_whatsapp(debt.customer.phone, debt_reminder_whatsapp_message(debt))
\ No newline at end of file
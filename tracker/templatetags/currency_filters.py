@@ -1,24 +1,31 @@
+from functools import lru_cache
+
 from django import template
 
 register = template.Library()
 
-@register.filter
+
+# Listings repeat the same amounts on many rows; Decimals, ints and floats are hashable
+@lru_cache(maxsize=4096)
+def _format_amount(value, spec):
+    return format(value, spec)
+
+@register.filter(is_safe=True)
 def tzs(value):
     """Format value as Tanzanian Shillings"""
     if value is None:
         return "TZS 0"
     try:
-        return f"TZS {value:,.0f}"
+        return "TZS " + _format_amount(value, ',.0f')
     except (ValueError, TypeError):
         return "TZS 0"
 
-@register.filter
+@register.filter(is_safe=True)
 def tzs_decimal(value):
     """Format value as Tanzanian Shillings with decimal places"""
     if value is None:
         return "TZS 0.00"
     try:
-        return f"TZS {value:,.2f}"
+        return "TZS " + _format_amount(value, ',.2f')
     except (ValueError, TypeError):
         return "TZS 0.00"
-
@@ -1,23 +1,38 @@
+from urllib.parse import urlencode
+
 from django import template
 
 register = template.Library()
 
 
 @register.simple_tag(takes_context=True)
-def url_replace(context, field, value):
+def url_replace(context, field, value, *drop):
     """Return encoded querystring with `field` set to `value`, preserving other GET params.
 
     If `value` is falsy (None, empty string, or literal 'None'), the parameter will be removed
     from the returned querystring. This makes it convenient to *toggle* flags while keeping
-    other GET parameters intact.
+    other GET parameters intact. Any further field names in `drop` are removed as well.
     """
     request = context.get('request')
     if not request:
         return ''
-    params = request.GET.copy()
+    # Pagination links call this many times per render: read GET once per request
+    # instead of deep-copying the QueryDict on every call
+    items = getattr(request, '_url_replace_items', None)
+    if items is None:
+        items = request._url_replace_items = list(request.GET.lists())
     # Treat falsy values as removal requests so template toggles work as expected
-    if value in (None, '', 'None'):
-        params.pop(field, None)
-    else:
-        params[field] = value
-    return params.urlencode()
+    keep = value not in (None, '', 'None')
+    pairs = []
+    for key, values in items:
+        if key in drop:
+            continue
+        if key != field:
+            pairs.extend((key, v) for v in values)
+        elif keep:
+            # Replace in place so the parameter order matches the current URL
+            pairs.append((key, value))
+            keep = False
+    if keep:
+        pairs.append((field, value))
+    return urlencode(pairs)
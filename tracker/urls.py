@@ -1,7 +1,67 @@
-from django.urls import path, reverse_lazy
+from django.urls import include, path, reverse_lazy
 from . import views
 from django.contrib.auth import views as auth_views
 
+# Per-resource groups: the resolver matches the prefix once and skips whole groups
+# that don't apply, instead of scanning every pattern in one flat list
+
+product_patterns = [
+    path('', views.product_list, name='product_list'),
+    path('<int:pk>/', views.product_detail, name='product_detail'),
+    path('create/', views.product_create, name='product_create'),
+    path('<int:pk>/update/', views.product_update, name='product_update'),
+]
+
+supplier_patterns = [
+    path('', views.supplier_list, name='supplier_list'),
+    path('create/', views.supplier_create, name='supplier_create'),
+    path('<int:pk>/update/', views.supplier_update, name='supplier_update'),
+]
+
+stationery_patterns = [
+    path('', views.stationery_list, name='stationery_list'),
+    path('<int:pk>/', views.stationery_detail, name='stationery_detail'),
+    path('create/', views.create_stationery_item, name='create_stationery_item'),
+]
+
+sales_patterns = [
+    path('', views.sales_list, name='sales_list'),
+    path('chart/', views.sales_chart, name='sales_chart'),
+    path('export/daily/', views.sales_daily_export_csv, name='sales_daily_export'),
+    path('export/daily/pdf/', views.sales_daily_export_pdf, name='sales_daily_export_pdf'),
+    path('print/daily/', views.sales_daily_print, name='sales_daily_print'),
+    path('<int:pk>/', views.sale_detail, name='sale_detail'),
+    path('<int:pk>/invoice/', views.print_invoice, name='print_invoice'),
+    path('<int:pk>/delete/', views.delete_sale, name='delete_sale'),
+    path('create/', views.create_sale, name='create_sale'),
+    path('<int:sale_id>/add-item/', views.add_sale_item, name='add_sale_item'),
+]
+
+debts_patterns = [
+    path('', views.debts_list, name='debts_list'),
+    path('<int:pk>/', views.debt_detail, name='debt_detail'),
+    path('create/', views.create_debt, name='create_debt'),
+    path('<int:debt_id>/payment/', views.add_payment, name='add_payment'),
+    path('<int:debt_id>/send-sms/', views.send_debt_sms, name='send_debt_sms'),
+    path('send-bulk-sms/', views.send_bulk_debt_sms, name='send_bulk_debt_sms'),
+    path('<int:debt_id>/send-whatsapp/', views.send_debt_whatsapp, name='send_debt_whatsapp'),
+    path('send-bulk-whatsapp/', views.send_bulk_debt_whatsapp, name='send_bulk_debt_whatsapp'),
+]
+
+expenditure_patterns = [
+    path('', views.expenditures_list, name='expenditures_list'),
+    path('create/', views.create_expenditure, name='create_expenditure'),
+    path('export/', views.expenditures_export_csv, name='expenditures_export'),
+    path('export/pdf/', views.expenditures_export_pdf, name='expenditures_export_pdf'),
+    path('<int:pk>/delete/', views.delete_expenditure, name='delete_expenditure'),
+]
+
+customer_patterns = [
+    path('', views.customers_list, name='customers_list'),
+    path('<int:pk>/', views.customer_detail, name='customer_detail'),
+    path('create/', views.create_customer, name='create_customer'),
+]
+
 urlpatterns = [
     # Authentication
     path('login/', views.login_view, name='login'),
@@ -22,55 +82,15 @@ urlpatterns = [
     path('login/password-reset-complete/', auth_views.PasswordResetCompleteView.as_view(
         template_name='registration/password_reset_complete.html',
     ), name='password_reset_complete'),
-    
-    # Products
-    path('products/', views.product_list, name='product_list'),
-    path('products/<int:pk>/', views.product_detail, name='product_detail'),
-    path('products/create/', views.product_create, name='product_create'),
-    path('products/<int:pk>/update/', views.product_update, name='product_update'),
-    
-    # Suppliers
-    path('suppliers/', views.supplier_list, name='supplier_list'),
-    path('suppliers/create/', views.supplier_create, name='supplier_create'),
-    path('suppliers/<int:pk>/update/', views.supplier_update, name='supplier_update'),
-    
-    # Stationery items
-    path('stationery/', views.stationery_list, name='stationery_list'),
-    path('stationery/<int:pk>/', views.stationery_detail, name='stationery_detail'),
-    path('stationery/create/', views.create_stationery_item, name='create_stationery_item'),
-    
-    # Sales
-    path('sales/', views.sales_list, name='sales_list'),
-    path('sales/chart/', views.sales_chart, name='sales_chart'),
-    path('sales/export/daily/', views.sales_daily_export_csv, name='sales_daily_export'),
-    path('sales/export/daily/pdf/', views.sales_daily_export_pdf, name='sales_daily_export_pdf'),
-    path('sales/print/daily/', views.sales_daily_print, name='sales_daily_print'),
-    path('sales/<int:pk>/', views.sale_detail, name='sale_detail'),
-    path('sales/<int:pk>/invoice/', views.print_invoice, name='print_invoice'),
-    path('sales/<int:pk>/delete/', views.delete_sale, name='delete_sale'),
-    path('sales/create/', views.create_sale, name='create_sale'),
-    path('sales/<int:sale_id>/add-item/', views.add_sale_item, name='add_sale_item'),
-    
-    # Debts
-    path('debts/', views.debts_list, name='debts_list'),
-    path('expenditures/', views.expenditures_list, name='expenditures_list'),
-    path('expenditures/create/', views.create_expenditure, name='create_expenditure'),
-    path('expenditures/export/', views.expenditures_export_csv, name='expenditures_export'),
-    path('expenditures/export/pdf/', views.expenditures_export_pdf, name='expenditures_export_pdf'),
-    path('expenditures/<int:pk>/delete/', views.delete_expenditure, name='delete_expenditure'),
-    path('debts/<int:pk>/', views.debt_detail, name='debt_detail'),
-    path('debts/create/', views.create_debt, name='create_debt'),
-    path('debts/<int:debt_id>/payment/', views.add_payment, name='add_payment'),
-    path('debts/<int:debt_id>/send-sms/', views.send_debt_sms, name='send_debt_sms'),
-    path('debts/send-bulk-sms/', views.send_bulk_debt_sms, name='send_bulk_debt_sms'),
-    path('debts/<int:debt_id>/send-whatsapp/', views.send_debt_whatsapp, name='send_debt_whatsapp'),
-    path('debts/send-bulk-whatsapp/', views.send_bulk_debt_whatsapp, name='send_bulk_debt_whatsapp'),
-    
-    # Customers
-    path('customers/', views.customers_list, name='customers_list'),
-    path('customers/<int:pk>/', views.customer_detail, name='customer_detail'),
-    path('customers/create/', views.create_customer, name='create_customer'),
-    
+
+    path('products/', include(product_patterns)),
+    path('suppliers/', include(supplier_patterns)),
+    path('stationery/', include(stationery_patterns)),
+    path('sales/', include(sales_patterns)),
+    path('debts/', include(debts_patterns)),
+    path('expenditures/', include(expenditure_patterns)),
+    path('customers/', include(customer_patterns)),
+
     # Dashboard (moved to root URLconf)
     path('dashboard/', views.dashboard, name='dashboard'),
 ]
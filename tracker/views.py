@@ -2,31 +2,74 @@ from decimal import Decimal
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.conf import settings
 from django.db import models
 from django.db import transaction
-from django.db.models import Sum, Count, Q, F, DecimalField, ExpressionWrapper, Exists, OuterRef, Case, When, Value, BooleanField
+from django.db.models import Sum, Count, Q, F, DecimalField, ExpressionWrapper, Exists, OuterRef, Case, When, Value, BooleanField, Prefetch
 from django.db.models.functions import TruncDate
 from django.utils import timezone
-from django.core.paginator import Paginator
-from datetime import datetime, timedelta
-from .models import StationeryItem, Sale, SaleItem, Debt, Customer, Category, Product, Supplier
+from django.utils.dateparse import parse_date
+from datetime import datetime, time, timedelta
+from .models import StationeryItem, Sale, SaleItem, Debt, Customer, Category, Product, Supplier, SaleDailySummary
 from .forms import SaleForm, SaleItemForm, DebtForm, PaymentForm, StationeryItemForm, CustomerForm, LoginForm, RegistrationForm, ProductForm, SupplierForm
 from django.contrib.auth import authenticate, login
 
 from .forms import ExpenditureForm
 from .models import Expenditure
+from .caching import bump_catalog_version, cached_active_customer_count, cached_active_customers, cached_catalog_stats, cached_dashboard
+from .pagination import PkSlicePaginator, keyset_page, next_cursor_for
 import csv
+import io
+from collections import defaultdict
+from itertools import islice
 import logging
-from django.http import HttpResponse
-from io import BytesIO
+from django.http import HttpResponse, StreamingHttpResponse
 import json
 
 logger = logging.getLogger(__name__)
+
+# Rows fetched per round trip by the streamed exports. On PostgreSQL iterator() reads
+# through a named server-side cursor (keep DISABLE_SERVER_SIDE_CURSORS unset); SQLite
+# steps its cursor lazily, so memory stays bounded by the chunk on both
+CSV_EXPORT_CHUNK_SIZE = 500
+
+# ?payment_status= values that filter on Sale.is_paid ('all' and anything else don't filter)
+_PAYMENT_STATUS_IS_PAID = {'paid': True, 'unpaid': False}
+
+# Payment method labels for the per-row exports, looked up without get_payment_method_display()
+_PAYMENT_METHOD_DISPLAY = dict(Sale.PAYMENT_CHOICES)
+
+# Category labels for the expenditure exports, which read rows as tuples rather than models
+_EXPENDITURE_CATEGORY_DISPLAY = dict(Expenditure.CATEGORY_CHOICES)
+
+# Total orders for the keyset-paginated listings and the chunked exports (the pk breaks ties)
+SALES_LIST_ORDERING = ('-sale_date', '-id')
+STATIONERY_LIST_ORDERING = ('name', 'id')
+EXPENDITURES_LIST_ORDERING = ('-expense_date', '-id')
 try:
     from reportlab.lib.pagesizes import A4
-    from reportlab.pdfgen import canvas
     from reportlab.lib.units import mm
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import LongTable, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
     REPORTLAB_AVAILABLE = True
+
+    # Layout shared by every PDF export, built once at import rather than per request
+    _PDF_TITLE_STYLE = getSampleStyleSheet()['Heading2']
+    _SALES_PDF_MARGIN = 15 * mm
+    _SALES_PDF_COL_WIDTHS = (25 * mm, 40 * mm, 55 * mm, 30 * mm, 30 * mm)
+    _SALES_PDF_TABLE_STYLE = TableStyle([
+        ('FONT', (0, 0), (-1, 0), 'Helvetica-Bold', 10),
+        ('FONT', (0, 1), (-1, -1), 'Helvetica', 10),
+        ('ALIGN', (3, 0), (4, -1), 'RIGHT'),
+        ('LINEBELOW', (0, 0), (-1, 0), 0.5, colors.black),
+    ])
+    _EXPENDITURES_PDF_MARGIN = 20 * mm
+    _EXPENDITURES_PDF_COL_WIDTHS = (20 * mm, 40 * mm, 40 * mm, 30 * mm, 40 * mm)
+    _EXPENDITURES_PDF_TABLE_STYLE = TableStyle([
+        ('FONT', (0, 0), (-1, -1), 'Helvetica', 10),
+        ('LINEBELOW', (0, 0), (-1, 0), 0.5, colors.black),
+    ])
 except Exception:
     REPORTLAB_AVAILABLE = False
 
@@ -34,7 +77,7 @@ except Exception:
 @login_required
 def product_list(request):
     """Display all products with supplier pricing and carton information"""
-    products = Product.objects.select_related('category', 'supplier').filter(is_active=True)
+    products = Product.objects.for_list().with_margins().filter(is_active=True)
     
     # Filter by category
     category_id = request.GET.get('category')
@@ -55,8 +98,23 @@ def product_list(request):
             Q(supplier__name__icontains=search_query)
         )
     
-    # Pagination
-    paginator = Paginator(products, 20)
+    # Calculate statistics in one aggregate query (stock value matches Product.get_total_value),
+    # cached per filter until a catalogue change
+    stats = cached_catalog_stats(
+        'products',
+        {'category': category_id, 'supplier': supplier_id, 'search': search_query},
+        lambda: products.aggregate(
+            total=Count('id'),
+            low=Count('id', filter=Q(cartons_in_stock__lte=F('minimum_cartons'))),
+            value=Sum(ExpressionWrapper(
+                F('cartons_in_stock') * F('selling_price'),
+                output_field=DecimalField(max_digits=14, decimal_places=2),
+            )),
+        ),
+    )
+    
+    # Pagination (the aggregate's total doubles as the paginator count)
+    paginator = PkSlicePaginator(products, 20, count=stats['total'])
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
@@ -64,18 +122,13 @@ def product_list(request):
     categories = Category.objects.all()
     suppliers = Supplier.objects.filter(is_active=True)
     
-    # Calculate statistics
-    total_products = products.count()
-    low_stock_products = products.filter(cartons_in_stock__lte=models.F('minimum_cartons')).count()
-    total_stock_value = sum(product.get_total_value() for product in products)
-    
     context = {
         'page_obj': page_obj,
         'categories': categories,
         'suppliers': suppliers,
-        'total_products': total_products,
-        'low_stock_products': low_stock_products,
-        'total_stock_value': total_stock_value,
+        'total_products': stats['total'],
+        'low_stock_products': stats['low'],
+        'total_stock_value': stats['value'] or Decimal('0'),
         'search_query': search_query or '',
         'selected_category': category_id or '',
         'selected_supplier': supplier_id or '',
@@ -89,10 +142,11 @@ def product_detail(request, pk):
     """Display detailed product information"""
     product = get_object_or_404(Product, pk=pk)
     
-    # Get recent sales for this product (only wholesale sales)
-    recent_sales = Sale.objects.filter(
-        items__wholesale_item=product
-    ).order_by('-sale_date')[:10]
+    # Get recent sales for this product (only wholesale sales); EXISTS rather than a
+    # join so a sale with several matching lines is listed once
+    recent_sales = Sale.objects.select_related(None).filter(
+        Exists(SaleItem.objects.filter(sale=OuterRef('pk'), wholesale_item=product))
+    ).only('sale_date', 'total_amount').order_by('-sale_date')[:10]
     
     context = {
         'product': product,
@@ -144,7 +198,8 @@ def product_update(request, pk):
 @login_required
 def supplier_list(request):
     """Display all suppliers"""
-    suppliers = Supplier.objects.filter(is_active=True)
+    # product_count replaces a per-row supplier.products.count() query in the template
+    suppliers = Supplier.objects.filter(is_active=True).annotate(product_count=Count('products'))
     
     # Search
     search_query = request.GET.get('search')
@@ -155,9 +210,9 @@ def supplier_list(request):
             Q(phone__icontains=search_query)
         )
     
-    # Calculate statistics
-    total_suppliers = suppliers.count()
-    total_products = sum(supplier.products.count() for supplier in suppliers)
+    # Calculate statistics from the rows the template renders anyway
+    total_suppliers = len(suppliers)
+    total_products = sum(supplier.product_count for supplier in suppliers)
     
     context = {
         'suppliers': suppliers,
@@ -243,72 +298,80 @@ def register_view(request):
 def dashboard(request):
 
     """Main dashboard view"""
+    # The figures are the same for every user: build them once per short window
+    today = timezone.localdate()
+    context = cached_dashboard(today, _dashboard_context)
+    return render(request, 'tracker/dashboard.html', context)
+
+
+def _dashboard_context():
+    """Build the dashboard figures; lists are materialised so the result can be cached."""
     # Get recent **paid** sales (exclude unpaid sales and sales with no items)
-    recent_sales = (
+    recent_sales = list(
         Sale.objects.select_related('customer')
         .prefetch_related('items__retail_item', 'items__wholesale_item')
-        .annotate(item_count=Count('items'))
-        .filter(is_paid=True, item_count__gt=0)
+        .filter(Exists(SaleItem.objects.filter(sale=OuterRef('pk'))), is_paid=True)
         .order_by('-sale_date')[:10]
     )
 
-    # Get low stock items
-    low_stock_items = StationeryItem.objects.filter(
+    # Low stock items: the count for the card and the first few rows for the list
+    low_stock_qs = StationeryItem.objects.filter(
         stock_quantity__lte=models.F('minimum_stock'),
         is_active=True
     )
+    low_stock_count = low_stock_qs.count()
+    low_stock_items = list(low_stock_qs[:5])
+    
+    # Outstanding debt and the overdue count in one aggregate over open debts
+    today = timezone.now().date()
+    open_debts = Debt.objects.filter(status__in=['pending', 'partial'])
+    debt_stats = open_debts.aggregate(
+        total=Sum(F('amount') - F('paid_amount')),
+        overdue=Count('id', filter=Q(due_date__lt=today)),
+    )
+    total_debt = debt_stats['total'] or 0
+    overdue_debts = list(open_debts.filter(due_date__lt=today).select_related('customer')[:5])
     
-    # Get overdue debts
-    overdue_debts = Debt.objects.filter(
-        due_date__lt=timezone.now().date(),
-        status__in=['pending', 'partial']
-    ).select_related('customer')
-    
-    # Calculate totals for today using timezone-aware range to avoid date-boundary issues
+    # Calculate totals for today and this month using timezone-aware ranges to avoid
+    # date-boundary issues: one aggregate per model, the today figures as FILTERed sums
     now_local = timezone.localtime(timezone.now())
     today_start = now_local.replace(hour=0, minute=0, second=0, microsecond=0)
     today_end = today_start + timedelta(days=1)
-    # Exclude unpaid sales from today's totals
-    today_sales = Sale.objects.filter(sale_date__gte=today_start, sale_date__lt=today_end, is_paid=True).aggregate(
-        total_sales=Sum('total_amount'),
-        count_sales=Count('id')
-    )
-
-    # Today's expenditures (used to compute net sales)
-    exp_today = Expenditure.objects.filter(expense_date__gte=today_start, expense_date__lt=today_end).aggregate(
-        total=Sum('amount'), count=Count('id')
-    )
-
-    # Compute net today's sales (sales minus today's expenditures)
-    today_total = today_sales.get('total_sales') or 0
-    today_exp = exp_today.get('total') or 0
-    net_today_sales = today_total - today_exp
-
-    # Calculate monthly totals using local timezone month range (exclude unpaid sales)
     month_start = today_start.replace(day=1)
     # find start of next month
     next_month = (month_start + timedelta(days=32)).replace(day=1)
-    monthly_sales = Sale.objects.filter(sale_date__gte=month_start, sale_date__lt=next_month, is_paid=True).aggregate(
-        total_sales=Sum('total_amount'),
-        count_sales=Count('id')
+    in_today = Q(sale_date__gte=today_start, sale_date__lt=today_end)
+    # Exclude unpaid sales from the totals
+    sale_stats = Sale.objects.filter(sale_date__gte=month_start, sale_date__lt=next_month, is_paid=True).aggregate(
+        today_total=Sum('total_amount', filter=in_today),
+        today_count=Count('id', filter=in_today),
+        month_total=Sum('total_amount'),
+        month_count=Count('id'),
     )
-
-    exp_month = Expenditure.objects.filter(expense_date__gte=month_start, expense_date__lt=next_month).aggregate(
-        total=Sum('amount'), count=Count('id')
+    today_sales = {'total_sales': sale_stats['today_total'], 'count_sales': sale_stats['today_count']}
+    monthly_sales = {'total_sales': sale_stats['month_total'], 'count_sales': sale_stats['month_count']}
+
+    # Expenditures over the same ranges (used to compute net sales)
+    exp_in_today = Q(expense_date__gte=today_start, expense_date__lt=today_end)
+    exp_stats = Expenditure.objects.filter(expense_date__gte=month_start, expense_date__lt=next_month).aggregate(
+        today_total=Sum('amount', filter=exp_in_today),
+        today_count=Count('id', filter=exp_in_today),
+        month_total=Sum('amount'),
+        month_count=Count('id'),
     )
-    month_total = monthly_sales.get('total_sales') or 0
-    month_exp = exp_month.get('total') or 0
-    net_monthly_sales = month_total - month_exp
-    
-    # Get total outstanding debt
-    total_debt = Debt.objects.filter(status__in=['pending', 'partial']).aggregate(
-        total=Sum('amount') - Sum('paid_amount')
-    )['total'] or 0
+    exp_today = {'total': exp_stats['today_total'], 'count': exp_stats['today_count']}
+    exp_month = {'total': exp_stats['month_total'], 'count': exp_stats['month_count']}
+
+    # Compute net sales (sales minus expenditures)
+    net_today_sales = (today_sales['total_sales'] or 0) - (exp_today['total'] or 0)
+    net_monthly_sales = (monthly_sales['total_sales'] or 0) - (exp_month['total'] or 0)
     
     context = {
         'recent_sales': recent_sales,
         'low_stock_items': low_stock_items,
+        'low_stock_count': low_stock_count,
         'overdue_debts': overdue_debts,
+        'overdue_count': debt_stats['overdue'],
         'today_sales': today_sales,
         'monthly_sales': monthly_sales,
         'total_debt': total_debt,
@@ -317,8 +380,7 @@ def dashboard(request):
         'net_today_sales': net_today_sales,
         'net_monthly_sales': net_monthly_sales,
     }
-    
-    return render(request, 'tracker/dashboard.html', context)
+    return context
 
 
 @login_required
@@ -326,7 +388,7 @@ def stationery_list(request):
     """List all stationery items"""
     # Include active items and any legacy items where is_active might be null
     # Start from all items; we'll restrict to active-only unless 'inactive' toggle is set
-    items = StationeryItem.objects.select_related('category').all()
+    items = StationeryItem.objects.for_list()
 
     # Filter by category if specified
     category_id = request.GET.get('category')
@@ -358,29 +420,56 @@ def stationery_list(request):
     else:
         selected_inactive = True
 
-    # Compute counts in the current search/category scope (respecting the default active/inactive selection)
-    low_stock_count = items.filter(stock_quantity__lte=models.F('minimum_stock')).count()
-    inactive_count = items.filter(is_active=False).count()
-
+    low_stock = Q(stock_quantity__lte=F('minimum_stock'))
+    # Rows actually listed: the current scope narrowed by the low-stock/inactive toggles
+    shown = Q()
     if low_stock_flag not in (None, '', 'None'):
         selected_low_stock = True
-        items = items.filter(stock_quantity__lte=models.F('minimum_stock'))
+        shown &= low_stock
 
     # If inactive checkbox is explicitly selected, show only inactive items
     if selected_inactive:
-        items = items.filter(is_active=False)
+        shown &= Q(is_active=False)
+
+    # One aggregate over the current search/category scope (respecting the default
+    # active/inactive selection) yields both the toggle badges and the listed-row stats;
+    # stock value matches StationeryItem.get_total_value. Cached per filter until a
+    # catalogue change
+    stock_value = ExpressionWrapper(
+        F('stock_quantity') * F('unit_price'),
+        output_field=DecimalField(max_digits=14, decimal_places=2),
+    )
+    stats = cached_catalog_stats(
+        'stationery',
+        {'category': category_id, 'search': search_query,
+         'low_stock': selected_low_stock, 'inactive': selected_inactive},
+        lambda: items.aggregate(
+            low_stock_count=Count('id', filter=low_stock),
+            inactive_count=Count('id', filter=Q(is_active=False)),
+            total=Count('id', filter=shown or None),
+            low=Count('id', filter=shown & low_stock),
+            value=Sum(stock_value, filter=shown or None),
+        ),
+    )
+    low_stock_count = stats['low_stock_count']
+    inactive_count = stats['inactive_count']
+    if shown:
+        items = items.filter(shown)
     
     categories = Category.objects.all()
     
-    # Calculate statistics (similar to product_list)
-    total_products = items.count()
-    low_stock_products = items.filter(stock_quantity__lte=models.F('minimum_stock')).count()
-    total_stock_value = sum(item.get_total_value() for item in items)
+    total_products = stats['total']
+    low_stock_products = stats['low']
+    total_stock_value = stats['value'] or Decimal('0')
     
-    # Paginate
-    page = request.GET.get('page')
-    paginator = Paginator(items, 20)
-    page_obj = paginator.get_page(page)
+    # Paginate; "Next" links carry a keyset cursor so deep pages need no OFFSET scan
+    items = items.order_by(*STATIONERY_LIST_ORDERING)
+    paginator = None
+    page_obj = keyset_page(items, STATIONERY_LIST_ORDERING, request.GET.get('cursor'), 20)
+    if page_obj is None:
+        paginator = PkSlicePaginator(items, 20, count=total_products)
+        page_obj = paginator.get_page(request.GET.get('page'))
+        page_obj.next_cursor = next_cursor_for(page_obj, STATIONERY_LIST_ORDERING)
 
     context = {
         'items': page_obj,
@@ -406,10 +495,11 @@ def stationery_detail(request, pk):
     """Detail view for a stationery item"""
     item = get_object_or_404(StationeryItem, pk=pk)
     
-    # Get recent sales for this stationery item (only retail sales)
-    recent_sales = Sale.objects.filter(
-        items__retail_item=item
-    ).order_by('-sale_date')[:10]
+    # Get recent sales for this stationery item (only retail sales); EXISTS rather than
+    # a join so a sale with several matching lines is listed once
+    recent_sales = Sale.objects.select_related(None).filter(
+        Exists(SaleItem.objects.filter(sale=OuterRef('pk'), retail_item=item))
+    ).only('sale_date', 'total_amount').order_by('-sale_date')[:10]
     
     context = {
         'item': item,
@@ -423,12 +513,15 @@ def stationery_detail(request, pk):
 def sales_list(request):
     """List all sales"""
     # Show all sales including payment-related sales (those without items)
-    # Payment sales are stored as sales with no items but notes like 'Payment for Debt #<id>'
-    sales = Sale.objects.select_related('customer', 'created_by').prefetch_related('items__retail_item', 'items__wholesale_item').annotate(
-        item_count=Count('items')
-    ).filter(
-        Q(item_count__gt=0) | Q(notes__contains='Payment for Debt')
-    ).order_by('-sale_date')
+    # Payment sales are stored as sales with no items and flagged is_payment
+    # One prefetch query for the lines, trimmed to what the products column reads
+    line_items = SaleItem.objects.select_related('retail_item', 'wholesale_item').only(
+        'sale', 'product_type', 'quantity', 'retail_item__name', 'wholesale_item__name',
+    )
+    sales = Sale.objects.select_related('customer', 'created_by').prefetch_related(Prefetch('items', queryset=line_items)).filter(
+        # EXISTS instead of a Count('items') join: no GROUP BY over every sale line
+        Exists(SaleItem.objects.filter(sale=OuterRef('pk'))) | Q(is_payment=True)
+    ).order_by(*SALES_LIST_ORDERING)
     
     # Filter by date range
     start_date = request.GET.get('start_date')
@@ -439,10 +532,7 @@ def sales_list(request):
     if end_date in (None, '', 'None'):
         end_date = None
     
-    if start_date:
-        sales = sales.filter(sale_date__date__gte=start_date)
-    if end_date:
-        sales = sales.filter(sale_date__date__lte=end_date)
+    sales = sales.filter(_sale_date_range_q(start_date, end_date))
     
     # Filter by payment status
     raw_payment_status = request.GET.get('payment_status')
@@ -454,14 +544,9 @@ def sales_list(request):
         payment_status = raw_payment_status
         payment_status_explicit = True
 
-    if payment_status == 'paid':
-        sales = sales.filter(is_paid=True)
-    elif payment_status == 'unpaid':
-        sales = sales.filter(is_paid=False)
-
-    elif payment_status == 'all':
-        # explicit request to include all sales
-        pass
+    # 'all' (an explicit request to include all sales) maps to no filter
+    if (is_paid := _PAYMENT_STATUS_IS_PAID.get(payment_status)) is not None:
+        sales = sales.filter(is_paid=is_paid)
 
     # Filter by product (items sold): sales that contain at least one item whose name matches
     product_search = request.GET.get('product') or request.GET.get('search_product')
@@ -478,21 +563,26 @@ def sales_list(request):
         )
         sales = sales.filter(Exists(has_product))
 
-    # Paginate before converting to list
-    page = request.GET.get('page')
-    paginator = Paginator(sales, 20)
-    page_obj = paginator.get_page(page)
+    # Calculate total amount and overall profit for all filtered sales (not just this page)
+    # in one aggregate; Sale.total_cost is the denormalised cost of the retail lines
+    totals = sales.aggregate(revenue=Sum('total_amount'), cost=Sum('total_cost'), count=Count('id'))
+    total_amount = totals['revenue'] or Decimal('0')
+    overall_cost = totals['cost'] or Decimal('0')
+    overall_profit = total_amount - overall_cost
 
-    # Annotate per-sale total_cost and profit to avoid N+1 queries in template
-    # We'll calculate this in Python instead of using complex annotations
+    # Paginate before converting to list; "Next" links carry a keyset cursor so deep
+    # pages need no OFFSET scan, and the aggregate's count spares the paginator a COUNT(*)
+    paginator = None
+    page_obj = keyset_page(sales, SALES_LIST_ORDERING, request.GET.get('cursor'), 20)
+    if page_obj is None:
+        paginator = PkSlicePaginator(sales, 20, count=totals['count'])
+        page_obj = paginator.get_page(request.GET.get('page'))
+        page_obj.next_cursor = next_cursor_for(page_obj, SALES_LIST_ORDERING)
+
+    # Per-sale profit for the template; Sale.total_cost is the denormalised cost of the
+    # retail lines, the same figure the overall totals above are summed from
     for sale in page_obj.object_list:
-        # Calculate total cost for this sale
-        total_cost = Decimal('0')
-        for item in sale.items.all():
-            if item.product_type == 'retail' and item.retail_item:
-                total_cost += item.quantity * (item.retail_item.cost_price or Decimal('0'))
-        sale.total_cost = total_cost
-        sale.annotated_profit = sale.total_amount - total_cost
+        sale.annotated_profit = sale.total_amount - sale.total_cost
 
     # Compute total expenditures for the same filter window (if date filters applied)
     exp_qs = Expenditure.objects.all()
@@ -502,74 +592,63 @@ def sales_list(request):
         exp_qs = exp_qs.filter(expense_date__date__lte=end_date)
     total_expenditure = exp_qs.aggregate(total=Sum('amount'))['total'] or Decimal('0')
 
-    # Calculate total amount and overall profit for filtered sales (using full queryset)
-    # We need to get the full queryset without pagination for totals
-    # Reset the queryset to get all results for calculations
-    sales_queryset = sales
-    total_amount = sum(sale.total_amount or Decimal('0') for sale in sales_queryset)
-    
-    # Calculate costs for all sales
-    overall_cost = Decimal('0')
-    for sale in sales_queryset:
-        sale_cost = Decimal('0')
-        for item in sale.items.all():
-            if item.product_type == 'retail' and item.retail_item:
-                sale_cost += item.quantity * (item.retail_item.cost_price or Decimal('0'))
-        sale.total_cost = sale_cost  # Store for daily aggregates
-        overall_cost += sale_cost
-    
-    overall_profit = total_amount - overall_cost
-
-    # Calculate daily aggregates (local timezone-aware) for the filtered sales.
-    # We group sales by their *local* date (timezone.localtime(sale.sale_date).date()) so
+    # Calculate daily aggregates (local timezone-aware) for the filtered sales with GROUP BY
+    # queries. Sales are bucketed by their *local* date (TruncDate in the current timezone) so
     # daily buckets match what's shown in the dashboard and templates.
+    local_tz = timezone.get_current_timezone()
+    sale_ids = sales.values('pk')
+    daily_rows = (
+        Sale.objects.filter(pk__in=sale_ids)
+        .annotate(day=TruncDate('sale_date', tzinfo=local_tz))
+        .values('day')
+        .annotate(revenue=Sum('total_amount'), cost=Sum('total_cost'), count=Count('id'))
+        .order_by()
+    )
     daily_map = {}
-    
-    product_search_lower = (product_search or '').lower()
-
-    for sale in sales_queryset:
-        local_date = timezone.localtime(sale.sale_date).date()
-        rev = sale.total_amount or Decimal('0')
-        cost = getattr(sale, 'total_cost', Decimal('0'))
-
-        entry = daily_map.setdefault(local_date, {
-            'revenue': Decimal('0'), 'cost': Decimal('0'), 'count': 0,
+    for row in daily_rows:
+        daily_map[row['day']] = {
+            'revenue': row['revenue'] or Decimal('0'), 'cost': row['cost'] or Decimal('0'), 'count': row['count'],
             'product_qty': 0, 'product_revenue': Decimal('0'), 'product_cost': Decimal('0'),
             'product_names': set(),
-        })
-        entry['revenue'] += rev
-        entry['cost'] += cost
-        entry['count'] += 1
-
-        # Product-specific aggregation
-        if product_search_lower:
-            matching_item_revenue = Decimal('0')
-            matching_item_cost = Decimal('0')
-            for si in sale.items.all():
-                item_name = si.item_name.lower()
-                if product_search_lower in item_name:
-                    entry['product_qty'] += si.quantity
-                    # Calculate the actual revenue and cost for this specific item
-                    item_revenue = si.total_price or Decimal('0')
-                    matching_item_revenue += item_revenue
-                    
-                    # Calculate cost for this specific item
-                    item_cost = Decimal('0')
-                    if si.product_type == 'retail' and si.retail_item:
-                        item_cost = si.quantity * (si.retail_item.cost_price or Decimal('0'))
-                    matching_item_cost += item_cost
-                    
-                    entry['product_names'].add(si.item_name)
-            
-            # Add only the matching item revenue and cost
-            entry['product_revenue'] += matching_item_revenue
-            entry['product_cost'] += matching_item_cost
+        }
+
+    # Product-specific aggregation: only the line items whose name matches the search
+    if product_search:
+        matching_items = SaleItem.objects.filter(sale__in=sale_ids).filter(
+            Q(product_type='retail', retail_item__name__icontains=product_search) |
+            Q(product_type='wholesale', wholesale_item__name__icontains=product_search)
+        ).annotate(day=TruncDate('sale__sale_date', tzinfo=local_tz))
+        product_rows = matching_items.values('day').annotate(
+            qty=Sum('quantity'),
+            revenue=Sum('total_price'),
+            cost=Sum(F('quantity') * F('retail_item__cost_price'), filter=Q(product_type='retail')),
+        ).order_by()
+        for row in product_rows:
+            entry = daily_map[row['day']]
+            entry['product_qty'] = row['qty'] or 0
+            entry['product_revenue'] = row['revenue'] or Decimal('0')
+            entry['product_cost'] = row['cost'] or Decimal('0')
+        product_names = matching_items.annotate(
+            name=Case(When(product_type='retail', then=F('retail_item__name')), default=F('wholesale_item__name'))
+        ).values_list('day', 'name').distinct().order_by()
+        for day, name in product_names:
+            daily_map[day]['product_names'].add(name)
+
+    # Expenditure totals for every listed day in one grouped query
+    exp_by_day = dict(
+        Expenditure.objects.filter(expense_date__date__in=list(daily_map))
+        .annotate(day=TruncDate('expense_date', tzinfo=local_tz))
+        .values('day')
+        .annotate(total=Sum('amount'))
+        .order_by()
+        .values_list('day', 'total')
+    )
 
     # Convert map into sorted list (newest date first)
     daily_sales = []
     for date_key in sorted(daily_map.keys(), reverse=True):
         data = daily_map[date_key]
-        exp_for_date = Expenditure.objects.filter(expense_date__date=date_key).aggregate(total=Sum('amount'))['total'] or Decimal('0')
+        exp_for_date = exp_by_day.get(date_key) or Decimal('0')
         if product_search:
             # Product filter: Total Sold = revenue from matching items only; Profit = that revenue − cost of those items.
             # Qty and Total Sold are then from the same line items (mathematically consistent).
@@ -604,6 +683,15 @@ def sales_list(request):
     daily_summary_total_profit = sum(d['profit'] for d in daily_sales)
     daily_summary_total_product_qty = sum(d.get('product_qty', 0) for d in daily_sales)
     
+    # Load every debt paid by a payment-only sale on this page, with its sale's creator
+    # and items, in one batch instead of two queries per row
+    payment_debt_ids = {sale.paid_debt_id for sale in page_obj.object_list if sale.paid_debt_id}
+    debts_by_id = {}
+    if payment_debt_ids:
+        debts_by_id = Debt.objects.select_related('item', 'sale__created_by').prefetch_related(
+            Prefetch('sale__items', queryset=SaleItem.objects.select_related('retail_item', 'wholesale_item'))
+        ).in_bulk(payment_debt_ids)
+
     # Ensure payment-sales (which have no SaleItem rows) display a sensible profit
     # annotated_profit may be NULL for such rows; compute from model property in Python
     for sale in page_obj.object_list:
@@ -612,29 +700,23 @@ def sales_list(request):
                 sale.annotated_profit = sale.profit
             except Exception:
                 sale.annotated_profit = Decimal('0')
+        debt = debts_by_id.get(sale.paid_debt_id)
+
         # Build a products string for display on the sales list for payment-only sales
-        try:
-            sale_items = list(sale.items.select_related('retail_item', 'wholesale_item').all())
-        except Exception:
-            sale_items = []
+        # (items come from the list queryset's prefetch)
+        sale_items = list(sale.items.all())
 
         products_list = []
         if sale_items:
             for si in sale_items:
                 products_list.append(f"{si.item_name} ({si.quantity})")
-        else:
-            import re
-            m = re.search(r'Payment for Debt #(\d+)', (sale.notes or ''))
-            if m:
-                try:
-                    debt = Debt.objects.select_related('item', 'sale').get(pk=int(m.group(1)))
-                    if debt.sale and debt.sale.items.exists():
-                        for si in debt.sale.items.select_related('retail_item', 'wholesale_item').all():
-                            products_list.append(f"{si.item_name} ({si.quantity})")
-                    elif debt.item:
-                        products_list.append(f"{debt.item.name} ({debt.quantity})")
-                except Debt.DoesNotExist:
-                    pass
+        elif debt is not None:
+            debt_items = list(debt.sale.items.all()) if debt.sale else []
+            if debt_items:
+                for si in debt_items:
+                    products_list.append(f"{si.item_name} ({si.quantity})")
+            elif debt.item:
+                products_list.append(f"{debt.item.name} ({debt.quantity})")
 
         sale.products = ', '.join(products_list) if products_list else None
 
@@ -642,28 +724,11 @@ def sales_list(request):
         # sales that reference a Debt, prefer the original sale's creator if available.
         created_by_name = None
         if sale.created_by:
-            try:
-                created_by_name = sale.created_by.get_full_name() or sale.created_by.username
-            except Exception:
-                try:
-                    created_by_name = sale.created_by.username
-                except Exception:
-                    created_by_name = None
+            created_by_name = sale.created_by.get_full_name() or sale.created_by.username
 
-        if not created_by_name:
-            # If this is a payment-sale, try to infer creator from the originating debt/sale
-            import re
-            m2 = re.search(r'Payment for Debt #(\d+)', (sale.notes or ''))
-            if m2:
-                try:
-                    debt = Debt.objects.select_related('sale__created_by').get(pk=int(m2.group(1)))
-                    if debt.sale and debt.sale.created_by:
-                        try:
-                            created_by_name = debt.sale.created_by.get_full_name() or debt.sale.created_by.username
-                        except Exception:
-                            created_by_name = getattr(debt.sale.created_by, 'username', None)
-                except Debt.DoesNotExist:
-                    pass
+        if not created_by_name and debt is not None and debt.sale and debt.sale.created_by:
+            # Payment-sale: infer the creator from the originating debt/sale
+            created_by_name = debt.sale.created_by.get_full_name() or debt.sale.created_by.username
 
         sale.created_by_display = created_by_name
 
@@ -674,6 +739,7 @@ def sales_list(request):
         'payment_status': payment_status,
         'product_search': product_search or '',
         'total_amount': total_amount,
+        'sales_count': totals['count'],
         'total_expenditure': total_expenditure,
         'daily_sales': daily_sales,
         'daily_summary_total_sold': daily_summary_total_sold,
@@ -746,8 +812,8 @@ def create_sale(request):
 @login_required
 def sales_chart(request):
     """Graphical representation of sales"""
-    # Get sales data for chart
-    sales = Sale.objects.filter(is_paid=True).order_by('sale_date')
+    # Paid sales per day come pre-totalled from SaleDailySummary (kept current by signals.py)
+    daily_sales = SaleDailySummary.objects.all()
     
     # Filter by date range if provided
     start_date = request.GET.get('start_date')
@@ -758,18 +824,13 @@ def sales_chart(request):
         end_date = None
     
     if start_date:
-        sales = sales.filter(sale_date__date__gte=start_date)
+        daily_sales = daily_sales.filter(day__gte=start_date)
     if end_date:
-        sales = sales.filter(sale_date__date__lte=end_date)
-    
-    # Group by date
-    from django.db.models.functions import TruncDate
-    daily_sales = sales.annotate(date=TruncDate('sale_date')).values('date').annotate(
-        total=Sum('total_amount')
-    ).order_by('date')
+        daily_sales = daily_sales.filter(day__lte=end_date)
+    daily_sales = list(daily_sales.values('day', 'total').order_by('day'))
     
     # Prepare data for Chart.js
-    labels = [item['date'].strftime('%Y-%m-%d') for item in daily_sales]
+    labels = [item['day'].strftime('%Y-%m-%d') for item in daily_sales]
     data = [float(item['total']) for item in daily_sales]
     
     context = {
@@ -782,95 +843,136 @@ def sales_chart(request):
     return render(request, 'tracker/sales_chart.html', context)
 
 
-@login_required
-def sales_daily_export_csv(request):
-    """Export daily sales summary (respecting same filters) as CSV."""
-    sales = Sale.objects.select_related('customer', 'created_by').order_by('-sale_date')
-    start_date = request.GET.get('start_date')
-    end_date = request.GET.get('end_date')
-    payment_status = request.GET.get('payment_status')
-    # guard against literal 'None' or empty strings
-    if start_date in (None, '', 'None'):
-        start_date = None
-    if end_date in (None, '', 'None'):
-        end_date = None
-    if payment_status in (None, '', 'None'):
-        payment_status = None
+# Sale columns the CSV/PDF/print exports read (paid_debt for the payment-sale fallbacks)
+EXPORT_SALE_FIELDS = (
+    'id', 'sale_date', 'total_amount', 'total_cost', 'payment_method', 'is_paid', 'paid_debt',
+    'customer__name', 'created_by__first_name', 'created_by__last_name', 'created_by__username',
+)
 
-    if start_date:
-        sales = sales.filter(sale_date__date__gte=start_date)
-    if end_date:
-        sales = sales.filter(sale_date__date__lte=end_date)
-    if payment_status == 'paid':
-        sales = sales.filter(is_paid=True)
-    elif payment_status == 'unpaid':
-        sales = sales.filter(is_paid=False)
 
+def _parse_day(value):
+    """The date in a 'YYYY-MM-DD' query value, or None if it is missing or malformed."""
+    try:
+        return parse_date(value) if value else None
+    except ValueError:
+        return None
+
+
+def _local_midnight(day):
+    """Aware datetime for the start of `day` in the current timezone."""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _sale_date_range_q(start_date, end_date):
+    """Q for sales made on the local dates start_date..end_date (inclusive).
+
+    Expressed as a half-open range on the raw sale_date column so its index stays usable;
+    a sale_date__date lookup wraps the column in a cast the index can't serve.
+    """
+    q = Q()
+    start = _parse_day(start_date)
+    if start:
+        q &= Q(sale_date__gte=_local_midnight(start))
+    end = _parse_day(end_date)
+    if end:
+        q &= Q(sale_date__lt=_local_midnight(end + timedelta(days=1)))
+    return q
+
+
+def _export_sales_qs():
+    """Newest-first sales joined to customer and creator, trimmed to the exported columns."""
+    return Sale.objects.select_related('customer', 'created_by').only(*EXPORT_SALE_FIELDS).order_by('-sale_date')
+
+
+def _filter_export_sales(request, sales):
+    """Apply the sales list filters in the query string; return (sales, parsed filters)."""
+    filters = {}
+    # guard against literal 'None' or empty strings passed from templates
+    for name in ('start_date', 'end_date', 'payment_status'):
+        value = request.GET.get(name)
+        filters[name] = None if value in (None, '', 'None') else value
     product_search = request.GET.get('product') or request.GET.get('search_product')
-    if product_search not in (None, '', 'None') and str(product_search).strip():
-        product_search = str(product_search).strip()
-        has_product = SaleItem.objects.filter(
-            sale=OuterRef('pk'),
-            retail_item__name__icontains=product_search,
-        ) | SaleItem.objects.filter(
-            sale=OuterRef('pk'),
-            wholesale_item__name__icontains=product_search,
+    if product_search in (None, '', 'None'):
+        product_search = None
+    else:
+        product_search = str(product_search).strip() or None
+    filters['product_search'] = product_search
+
+    sales = sales.filter(_sale_date_range_q(filters['start_date'], filters['end_date']))
+    if (is_paid := _PAYMENT_STATUS_IS_PAID.get(filters['payment_status'])) is not None:
+        sales = sales.filter(is_paid=is_paid)
+    if product_search:
+        # SaleItem.item is a property: match the name on either item table
+        has_product = SaleItem.objects.filter(sale=OuterRef('pk')).filter(
+            Q(retail_item__name__icontains=product_search) |
+            Q(wholesale_item__name__icontains=product_search)
         )
         sales = sales.filter(Exists(has_product))
+    return sales, filters
 
-    # Export all matching sales (row per sale) as CSV
-    sales = sales.select_related('customer').prefetch_related('items__retail_item', 'items__wholesale_item')
 
-    try:
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="all_sales.csv"'
-        writer = csv.writer(response)
-        # Header
-        writer.writerow(['Sale ID', 'Date', 'Customer', 'Amount', 'Profit', 'Payment Method', 'Status', 'Created By'])
-
-        for sale in sales:
-            # compute total cost for the sale
-            try:
-                total_cost = sum((si.quantity * (si.item.cost_price or Decimal('0'))) for si in sale.items.all())
-            except Exception:
-                total_cost = Decimal('0')
-            revenue = sale.total_amount or Decimal('0')
-            # If sale has items, profit is revenue - total_cost; otherwise, try to use Sale.profit
-            if sale.items.exists():
-                profit = revenue - (total_cost or Decimal('0'))
-            else:
-                try:
-                    profit = sale.profit
-                except Exception:
-                    profit = Decimal('0')
+def _annotate_sale_profit(sales):
+    """Annotate computed_profit = total_amount - total_cost (the retail cost of goods) in SQL."""
+    return sales.annotate(computed_profit=ExpressionWrapper(
+        F('total_amount') - F('total_cost'),
+        output_field=DecimalField(max_digits=12, decimal_places=2),
+    ))
+
+
+def _csv_chunks(rows):
+    """Format `rows` as CSV, yielding one string per CSV_EXPORT_CHUNK_SIZE rows.
+
+    writerows() formats a whole batch in C, and the response gets one chunk per batch
+    rather than one per line.
+    """
+    rows = iter(rows)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    while batch := list(islice(rows, CSV_EXPORT_CHUNK_SIZE)):
+        writer.writerows(batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
 
-            # format
-            try:
-                date_str = timezone.localtime(sale.sale_date).strftime('%Y-%m-%d %H:%M:%S')
-            except Exception:
-                date_str = str(sale.sale_date)
 
-            created_by = sale.created_by.get_full_name() if sale.created_by else ''
-            customer = sale.customer.name if sale.customer else 'Walk-in'
+@login_required
+def sales_daily_export_csv(request):
+    """Export daily sales summary (respecting same filters) as CSV."""
+    sales, _ = _filter_export_sales(request, _export_sales_qs())
+
+    # Export all matching sales (row per sale) as CSV. with_profit_data() loads what
+    # Sale.profit reads, and iterator() streams the rows in chunks (prefetches run per
+    # chunk) instead of holding every sale in memory
+    sales = sales.with_profit_data()
+
+    def rows():
+        # Resolve the display timezone once rather than per row
+        tz = timezone.get_current_timezone()
+        yield ['Sale ID', 'Date', 'Customer', 'Amount', 'Profit', 'Payment Method', 'Status', 'Created By']
+        for sale in sales.iterator(chunk_size=CSV_EXPORT_CHUNK_SIZE):
+            revenue = sale.total_amount or Decimal('0')
+            # Item sales: revenue - stored cost of goods; payment sales: share of the debt's profit
+            profit = sale.profit
 
-            amount_str = format(revenue, ',.0f')
-            profit_str = format(profit, ',.0f')
+            date_str = sale.sale_date.astimezone(tz).strftime('%Y-%m-%d %H:%M:%S')
 
-            writer.writerow([
+            created_by = sale.created_by.get_full_name() if sale.created_by_id else ''
+            customer = sale.customer.name if sale.customer_id else 'Walk-in'
+
+            yield [
                 sale.id,
                 date_str,
                 customer,
-                amount_str,
-                profit_str,
-                sale.get_payment_method_display(),
+                format(revenue, ',.0f'),
+                format(profit, ',.0f'),
+                _PAYMENT_METHOD_DISPLAY.get(sale.payment_method, sale.payment_method),
                 'Paid' if sale.is_paid else 'Unpaid',
                 created_by,
-            ])
+            ]
 
-        return response
-    except Exception:
-        messages.error(request, 'Failed to export sales CSV. Please try again.')
-        return redirect('sales_list')
+    response = StreamingHttpResponse(_csv_chunks(rows()), content_type='text/csv')
+    response['Content-Disposition'] = 'attachment; filename="all_sales.csv"'
+    return response
 
 
 @login_required
@@ -880,98 +982,49 @@ def sales_daily_export_pdf(request):
         messages.error(request, 'PDF export requires the ReportLab package. Install it with `pip install reportlab`.')
         return redirect('sales_list')
 
-    sales = Sale.objects.select_related('customer', 'created_by').order_by('-sale_date')
-    start_date = request.GET.get('start_date')
-    end_date = request.GET.get('end_date')
-    payment_status = request.GET.get('payment_status')
-    # guard against literal 'None' or empty strings
-    if start_date in (None, '', 'None'):
-        start_date = None
-    if end_date in (None, '', 'None'):
-        end_date = None
-    if payment_status in (None, '', 'None'):
-        payment_status = None
-
-    if start_date:
-        sales = sales.filter(sale_date__date__gte=start_date)
-    if end_date:
-        sales = sales.filter(sale_date__date__lte=end_date)
-    if payment_status == 'paid':
-        sales = sales.filter(is_paid=True)
-    elif payment_status == 'unpaid':
-        sales = sales.filter(is_paid=False)
-
-    product_search = request.GET.get('product') or request.GET.get('search_product')
-    if product_search not in (None, '', 'None') and str(product_search).strip():
-        product_search = str(product_search).strip()
-        has_product = SaleItem.objects.filter(
-            sale=OuterRef('pk'),
-            item__name__icontains=product_search,
-        )
-        sales = sales.filter(Exists(has_product))
-
-    # Export all matching sales (no two-day cap) as a PDF listing individual sales
-    # Build list of sales respecting filters
-    sales = sales.select_related('customer').prefetch_related('items__retail_item', 'items__wholesale_item')
-
-    buffer = BytesIO()
-    p = canvas.Canvas(buffer, pagesize=A4)
-    width, height = A4
-    margin = 15 * mm
-    y = height - margin
-
-    p.setFont('Helvetica-Bold', 14)
-    p.drawString(margin, y, 'All Sales Report')
-    y -= 10 * mm
-    p.setFont('Helvetica-Bold', 10)
-    # Header row
-    p.drawString(margin, y, 'Sale #')
-    p.drawString(margin + 25 * mm, y, 'Date')
-    p.drawString(margin + 65 * mm, y, 'Customer')
-    p.drawString(margin + 120 * mm, y, 'Amount')
-    p.drawString(margin + 150 * mm, y, 'Profit')
-    y -= 6 * mm
-    p.setFont('Helvetica', 10)
+    sales, _ = _filter_export_sales(request, _export_sales_qs())
 
-    for sale in sales:
-        # Paginate
-        if y < margin + 20 * mm:
-            p.showPage()
-            y = height - margin
-            p.setFont('Helvetica', 10)
+    # Export all matching sales (no two-day cap) as a PDF listing individual sales.
+    # Profit is computed in the query, so lines aren't loaded at all
+    sales = _annotate_sale_profit(sales)
 
-        # Compute cost for the sale by summing related items
-        try:
-            total_cost = sum((si.quantity * (si.item.cost_price or Decimal('0'))) for si in sale.items.all())
-        except Exception:
-            total_cost = Decimal('0')
+    # One table row per sale; Platypus lays the table out and breaks it across pages,
+    # repeating the header row, instead of a drawString call per cell
+    tz = timezone.get_current_timezone()
+    data = [['Sale #', 'Date', 'Customer', 'Amount', 'Profit']]
+    for sale in sales.iterator(chunk_size=CSV_EXPORT_CHUNK_SIZE):
         revenue = sale.total_amount or Decimal('0')
-        profit = revenue - (total_cost or Decimal('0'))
+        profit = sale.computed_profit or Decimal('0')
 
-        date_str = ''
-        try:
-            date_str = timezone.localtime(sale.sale_date).strftime('%Y-%m-%d')
-        except Exception:
-            date_str = str(sale.sale_date)
-
-        customer_name = sale.customer.name if sale.customer else 'Walk-in'
+        date_str = sale.sale_date.astimezone(tz).strftime('%Y-%m-%d')
 
-        amount_str = format(revenue, ',.0f')
-        profit_str = format(profit, ',.0f')
+        customer_name = sale.customer.name if sale.customer_id else 'Walk-in'
 
-        p.drawString(margin, y, f"#{sale.id}")
-        p.drawString(margin + 25 * mm, y, date_str)
-        p.drawString(margin + 65 * mm, y, customer_name[:22])
-        p.drawRightString(margin + 145 * mm, y, amount_str)
-        p.drawRightString(margin + 175 * mm, y, profit_str)
+        data.append([
+            f"#{sale.id}",
+            date_str,
+            customer_name[:22],
+            format(revenue, ',.0f'),
+            format(profit, ',.0f'),
+        ])
 
-        y -= 6 * mm
+    table = Table(data, colWidths=_SALES_PDF_COL_WIDTHS, repeatRows=1, style=_SALES_PDF_TABLE_STYLE)
 
-    p.showPage()
-    p.save()
-    buffer.seek(0)
-    response = HttpResponse(buffer.getvalue(), content_type='application/pdf')
+    # ReportLab writes the finished document straight into the response, with no
+    # intermediate buffer to copy out of
+    response = HttpResponse(content_type='application/pdf')
     response['Content-Disposition'] = 'attachment; filename="all_sales.pdf"'
+    margin = _SALES_PDF_MARGIN
+    doc = SimpleDocTemplate(
+        response, pagesize=A4, title='All Sales Report',
+        leftMargin=margin, rightMargin=margin, topMargin=margin, bottomMargin=margin,
+    )
+    doc.build([
+        Paragraph('All Sales Report', _PDF_TITLE_STYLE),
+        Spacer(1, 4 * mm),
+        table,
+    ])
+
     return response
 
 
@@ -979,129 +1032,77 @@ def sales_daily_export_pdf(request):
 def sales_daily_print(request):
     """Render a print-friendly HTML view of the daily sales summary."""
     # Render a print-friendly HTML listing of all matching sales (one row per sale)
-    sales = Sale.objects.select_related('customer', 'created_by').order_by('-sale_date')
-    start_date = request.GET.get('start_date')
-    end_date = request.GET.get('end_date')
-    payment_status = request.GET.get('payment_status')
-    # guard against literal 'None' or empty strings
-    if start_date in (None, '', 'None'):
-        start_date = None
-    if end_date in (None, '', 'None'):
-        end_date = None
-    if payment_status in (None, '', 'None'):
-        payment_status = None
-
-    if start_date:
-        sales = sales.filter(sale_date__date__gte=start_date)
-    if end_date:
-        sales = sales.filter(sale_date__date__lte=end_date)
-    if payment_status == 'paid':
-        sales = sales.filter(is_paid=True)
-    elif payment_status == 'unpaid':
-        sales = sales.filter(is_paid=False)
-
-    product_search = request.GET.get('product') or request.GET.get('search_product')
-    if product_search not in (None, '', 'None') and str(product_search).strip():
-        product_search = str(product_search).strip()
-        has_product = SaleItem.objects.filter(
-            sale=OuterRef('pk'),
-            item__name__icontains=product_search,
-        )
-        sales = sales.filter(Exists(has_product))
-
-    sales = sales.select_related('customer').prefetch_related('items__retail_item', 'items__wholesale_item')
+    sales, filters = _filter_export_sales(request, _export_sales_qs())
+
+    sale_pks = sales.values('pk')
+    sales = list(_annotate_sale_profit(sales))
+
+    # Debts paid by the payment-only sales, with the originating sale and the creators
+    # the fallbacks below read, in one batch instead of per row
+    debt_ids = {sale.paid_debt_id for sale in sales if sale.paid_debt_id}
+    debts_by_id = {}
+    if debt_ids:
+        debts_by_id = Debt.objects.select_related('item', 'sale__created_by', 'created_by').in_bulk(debt_ids)
+
+    # "Name (qty)" for every line of the listed sales and of the debts' originating sales,
+    # read as plain tuples in one query instead of prefetching line and item rows
+    debt_sale_ids = {debt.sale_id for debt in debts_by_id.values() if debt.sale_id}
+    products_by_sale = defaultdict(list)
+    lines = SaleItem.objects.filter(Q(sale__in=sale_pks) | Q(sale_id__in=debt_sale_ids)).order_by('id').values_list(
+        'sale_id', 'product_type', 'retail_item__name', 'wholesale_item__name', 'quantity',
+    )
+    for sale_id, product_type, retail_name, wholesale_name, quantity in lines:
+        name = retail_name if product_type == 'retail' else wholesale_name
+        products_by_sale[sale_id].append(f"{name} ({quantity})")
 
+    tz = timezone.get_current_timezone()
     rows = []
     for sale in sales:
-        try:
-            total_cost = sum(
-                (si.quantity * (si.retail_item.cost_price if si.product_type == 'retail' and si.retail_item else Decimal('0'))) 
-                for si in sale.items.all()
-            )
-        except Exception:
-            total_cost = Decimal('0')
         revenue = sale.total_amount or Decimal('0')
-        profit = revenue - (total_cost or Decimal('0'))
+        profit = sale.computed_profit or Decimal('0')
+        debt = debts_by_id.get(sale.paid_debt_id)
 
-        try:
-            date_str = timezone.localtime(sale.sale_date).strftime('%Y-%m-%d %H:%M')
-        except Exception:
-            date_str = str(sale.sale_date)
+        date_str = sale.sale_date.astimezone(tz).strftime('%Y-%m-%d %H:%M')
 
         # Determine products for this sale. For payment-only sales (no items)
         # try to infer the original product(s) from an associated Debt.
-        products_list = []
-        try:
-            sale_items = list(sale.items.select_related('item').all())
-        except Exception:
-            sale_items = []
-
-        if sale_items:
-            for si in sale_items:
-                products_list.append(f"{si.item.name} ({si.quantity})")
-        else:
-            # Try to infer from notes like 'Payment for Debt #<id>'
-            import re
-            m = re.search(r'Payment for Debt #(\d+)', (sale.notes or ''))
-            if m:
-                from .models import Debt
-                try:
-                    debt = Debt.objects.select_related('item', 'sale').get(pk=int(m.group(1)))
-                    # If the debt references an originating sale with items, use those
-                    if debt.sale and debt.sale.items.exists():
-                        for si in debt.sale.items.select_related('item').all():
-                            products_list.append(f"{si.item.name} ({si.quantity})")
-                    elif debt.item:
-                        products_list.append(f"{debt.item.name} ({debt.quantity})")
-                except Debt.DoesNotExist:
-                    pass
+        products_list = products_by_sale.get(sale.id)
+        if not products_list and debt is not None:
+            # If the debt references an originating sale with items, use those
+            products_list = products_by_sale.get(debt.sale_id)
+            if not products_list and debt.item:
+                products_list = [f"{debt.item.name} ({debt.quantity})"]
 
         products_str = ', '.join(products_list) if products_list else ''
 
         # Determine created_by for print rows. Prefer sale.created_by, then
         # originating sale's created_by (if debt.sale), then debt.created_by.
         created_by_name = ''
-        if sale.created_by:
-            try:
-                created_by_name = sale.created_by.get_full_name() or sale.created_by.username
-            except Exception:
-                created_by_name = getattr(sale.created_by, 'username', '')
-        else:
-            import re
-            m2 = re.search(r'Payment for Debt #(\d+)', (sale.notes or ''))
-            if m2:
-                try:
-                    debt = Debt.objects.select_related('sale__created_by', 'created_by').get(pk=int(m2.group(1)))
-                    if debt.sale and debt.sale.created_by:
-                        try:
-                            created_by_name = debt.sale.created_by.get_full_name() or debt.sale.created_by.username
-                        except Exception:
-                            created_by_name = getattr(debt.sale.created_by, 'username', '')
-                    elif debt.created_by:
-                        try:
-                            created_by_name = debt.created_by.get_full_name() or debt.created_by.username
-                        except Exception:
-                            created_by_name = getattr(debt.created_by, 'username', '')
-                except Debt.DoesNotExist:
-                    created_by_name = ''
+        if sale.created_by_id:
+            created_by_name = sale.created_by.get_full_name() or sale.created_by.username
+        elif debt is not None:
+            if debt.sale_id and debt.sale.created_by_id:
+                created_by_name = debt.sale.created_by.get_full_name() or debt.sale.created_by.username
+            elif debt.created_by_id:
+                created_by_name = debt.created_by.get_full_name() or debt.created_by.username
 
         rows.append({
             'id': sale.id,
             'date': date_str,
-            'customer': sale.customer.name if sale.customer else 'Walk-in',
+            'customer': sale.customer.name if sale.customer_id else 'Walk-in',
             'amount': revenue,
             'profit': profit,
             'products': products_str,
-            'payment_method': sale.get_payment_method_display(),
+            'payment_method': _PAYMENT_METHOD_DISPLAY.get(sale.payment_method, sale.payment_method),
             'status': 'Paid' if sale.is_paid else 'Unpaid',
             'created_by': created_by_name,
         })
 
     context = {
         'sales_rows': rows,
-        'start_date': start_date,
-        'end_date': end_date,
-        'payment_status': payment_status,
+        'start_date': filters['start_date'],
+        'end_date': filters['end_date'],
+        'payment_status': filters['payment_status'],
     }
 
     return render(request, 'tracker/sales_all_print.html', context)
@@ -1113,32 +1114,28 @@ def delete_sale(request, pk):
     sale = get_object_or_404(Sale, pk=pk)
 
     if request.method == 'POST':
-        # Capture restored items info before deletion and restore stock
+        # Capture restored items info before deletion; the stock itself is restored in
+        # bulk (one UPDATE per item table) by the Sale pre_delete signal when the sale is
+        # deleted below
         restored_items = []
-        for si in sale.items.all():
-            # Restore stock based on product type
+        lines = list(sale.items.select_related('retail_item', 'wholesale_item'))
+        for si in lines:
             if si.product_type == 'retail' and si.retail_item:
-                si.retail_item.stock_quantity += si.quantity
-                si.retail_item.save(update_fields=['stock_quantity'])
                 restored_items.append(f"{si.retail_item.name} (+{si.quantity} units)")
             elif si.product_type == 'wholesale' and si.wholesale_item:
-                si.wholesale_item.cartons_in_stock += si.quantity
-                si.wholesale_item.save(update_fields=['cartons_in_stock'])
                 restored_items.append(f"{si.wholesale_item.name} (+{si.quantity} cartons)")
 
-        # Check if this is a payment sale for a debt
-        if not sale.items.exists() and sale.notes and 'Payment for Debt #' in sale.notes:
-            import re
-            match = re.search(r'Payment for Debt #(\d+)', sale.notes)
-            if match:
-                debt_id = int(match.group(1))
+        # The payment reversal, stock restores and the delete commit or roll back together
+        with transaction.atomic():
+            # Payment sales are linked to the debt they paid
+            if not lines and sale.paid_debt_id:
                 try:
-                    from .models import Debt
-                    debt = Debt.objects.get(pk=debt_id)
-                    # Restore stock for the debt's item and quantity
+                    debt = Debt.objects.select_related(None).select_for_update().get(pk=sale.paid_debt_id)
+                    # Restore stock for the debt's item and quantity in place
                     if debt.item:
-                        debt.item.stock_quantity += debt.quantity
-                        debt.item.save(update_fields=['stock_quantity'])
+                        StationeryItem.objects.filter(pk=debt.item_id).update(
+                            stock_quantity=F('stock_quantity') + debt.quantity
+                        )
                         restored_items.append(f"{debt.item.name} (+{debt.quantity})")
                     # Reverse the payment
                     debt.paid_amount -= sale.total_amount
@@ -1155,7 +1152,7 @@ def delete_sale(request, pk):
                 except Debt.DoesNotExist:
                     pass  # Debt might have been deleted already
 
-        sale.delete()
+            sale.delete()
 
         if restored_items:
             messages.success(request, f"Sale deleted. Restored stock: {', '.join(restored_items)}")
@@ -1177,6 +1174,15 @@ def create_sale(request):
         item_form = SaleItemForm(request.POST)
         
         if sale_form.is_valid() and item_form.is_valid():
+            sale_item = item_form.save(commit=False)
+            if sale_item.item is None:
+                messages.error(request, 'Please select a valid product.')
+                context = {
+                    'sale_form': sale_form,
+                    'item_form': item_form,
+                }
+                return render(request, 'tracker/sale_form.html', context)
+
             try:
                 with transaction.atomic():
                     # Create sale first
@@ -1185,31 +1191,9 @@ def create_sale(request):
                     sale.total_amount = 0.00  # Will be calculated
                     sale.save()
                     
-                    # Add the first item
-                    sale_item = item_form.save(commit=False)
+                    # Save the first item; its conditional stock UPDATE is the stock check,
+                    # and a shortfall rolls the new sale back with it
                     sale_item.sale = sale
-                    
-                    # Check stock availability based on product type
-                    stock_error = None
-                    if sale_item.product_type == 'retail' and sale_item.retail_item:
-                        if sale_item.retail_item.stock_quantity < sale_item.quantity:
-                            stock_error = f'Insufficient stock for {sale_item.retail_item.name}! Available: {sale_item.retail_item.stock_quantity}, Requested: {sale_item.quantity}'
-                    elif sale_item.product_type == 'wholesale' and sale_item.wholesale_item:
-                        if sale_item.wholesale_item.cartons_in_stock < sale_item.quantity:
-                            stock_error = f'Insufficient stock for {sale_item.wholesale_item.name}! Available: {sale_item.wholesale_item.cartons_in_stock}, Requested: {sale_item.quantity}'
-                    else:
-                        stock_error = 'Please select a valid product.'
-                    
-                    if stock_error:
-                        messages.error(request, stock_error)
-                        sale.delete()  # Clean up the sale since no items were added
-                        context = {
-                            'sale_form': sale_form,
-                            'item_form': item_form,
-                        }
-                        return render(request, 'tracker/sale_form.html', context)
-                    
-                    # Save the sale item (this will reduce stock)
                     sale_item.save()
                     
                     # Update sale total
@@ -1219,6 +1203,14 @@ def create_sale(request):
                     messages.success(request, 'Sale created successfully with first item!')
                     return redirect('sale_detail', pk=sale.pk)
                     
+            except ValueError as e:
+                # Insufficient stock
+                messages.error(request, str(e))
+                context = {
+                    'sale_form': sale_form,
+                    'item_form': item_form,
+                }
+                return render(request, 'tracker/sale_form.html', context)
             except Exception as e:
                 messages.error(request, f'Error creating sale: {str(e)}')
         else:
@@ -1245,7 +1237,8 @@ def add_sale_item(request, sale_id):
             try:
                 with transaction.atomic():
                     # Lock the sale row for this transaction so concurrent requests serialize
-                    sale = Sale.objects.select_for_update().get(pk=sale_id)
+                    # (no joins: FOR UPDATE can't lock the nullable side of an outer join)
+                    sale = Sale.objects.select_related(None).select_for_update().get(pk=sale_id)
 
                     sale_item = form.save(commit=False)
                     sale_item.sale = sale
@@ -1260,46 +1253,15 @@ def add_sale_item(request, sale_id):
                     except SaleItem.DoesNotExist:
                         existing_item = None
 
-                    # Check stock availability based on product type
-                    stock_error = None
-                    if sale_item.product_type == 'retail' and sale_item.retail_item:
-                        if existing_item is None and sale_item.retail_item.stock_quantity < sale_item.quantity:
-                            stock_error = f'Insufficient stock for {sale_item.retail_item.name}! Available: {sale_item.retail_item.stock_quantity}, Requested: {sale_item.quantity}'
-                    elif sale_item.product_type == 'wholesale' and sale_item.wholesale_item:
-                        if existing_item is None and sale_item.wholesale_item.cartons_in_stock < sale_item.quantity:
-                            stock_error = f'Insufficient stock for {sale_item.wholesale_item.name}! Available: {sale_item.wholesale_item.cartons_in_stock}, Requested: {sale_item.quantity}'
-                    
-                    if stock_error:
-                        messages.error(request, stock_error)
-                        context = {
-                            'form': form,
-                            'sale': sale,
-                        }
-                        return render(request, 'tracker/add_sale_item.html', context)
-
                     try:
+                        # Stock is checked and deducted by one conditional UPDATE on either path
+                        # (ValueError when short), so there is no separate read-then-check.
                         # If the item already exists on the sale, increase its quantity instead of creating a duplicate
                         merged = False
                         additional = 0
                         if existing_item:
                             additional = sale_item.quantity
-                            # Check stock for additional quantity
-                            stock_error = None
-                            if sale_item.product_type == 'retail' and sale_item.retail_item:
-                                if sale_item.retail_item.stock_quantity < additional:
-                                    stock_error = f'Insufficient stock for {sale_item.retail_item.name}! Available: {sale_item.retail_item.stock_quantity}, Requested additional: {additional}'
-                            elif sale_item.product_type == 'wholesale' and sale_item.wholesale_item:
-                                if sale_item.wholesale_item.cartons_in_stock < additional:
-                                    stock_error = f'Insufficient stock for {sale_item.wholesale_item.name}! Available: {sale_item.wholesale_item.cartons_in_stock}, Requested additional: {additional}'
-                            
-                            if stock_error:
-                                messages.error(request, stock_error)
-                                context = {
-                                    'form': form,
-                                    'sale': sale,
-                                }
-                                return render(request, 'tracker/add_sale_item.html', context)
-
+                            existing_item.take_stock(additional)
                             existing_item.quantity = existing_item.quantity + additional
                             # Update unit_price to the latest provided price (could choose to keep existing)
                             existing_item.unit_price = sale_item.unit_price
@@ -1321,7 +1283,7 @@ def add_sale_item(request, sale_id):
 
                         return redirect('sale_detail', pk=sale.pk)
                     except ValueError as e:
-                        # Handle stock validation error from model (for updates or race conditions)
+                        # Insufficient stock
                         messages.error(request, str(e))
                         context = {
                             'form': form,
@@ -1383,13 +1345,17 @@ def debts_list(request):
                 Q(description__icontains=search_query)
             )
     
-    # Get all customers for the dropdown
-    customers = Customer.objects.filter(is_active=True).order_by('name')
+    # Get all customers for the dropdown (cached until a customer changes)
+    customers = cached_active_customers(
+        lambda: list(Customer.objects.filter(is_active=True).only('id', 'name').order_by('name'))
+    )
     
-    # Totals for the filtered dataset
+    # Totals for the filtered dataset; the row count rides along so the paginator
+    # skips its own COUNT(*)
     totals = debts.aggregate(
         total_amount=Sum('amount'),
-        total_paid=Sum('paid_amount')
+        total_paid=Sum('paid_amount'),
+        count=Count('id'),
     )
     total_amount = totals['total_amount'] or Decimal('0')
     total_paid = totals['total_paid'] or Decimal('0')
@@ -1397,7 +1363,7 @@ def debts_list(request):
     
     # Paginate
     page = request.GET.get('page')
-    paginator = Paginator(debts, 20)
+    paginator = PkSlicePaginator(debts, 20, count=totals['count'])
     page_obj = paginator.get_page(page)
 
     context = {
@@ -1419,7 +1385,7 @@ def debts_list(request):
 @login_required
 def expenditures_list(request):
     """List expenditures and totals"""
-    expenditures = Expenditure.objects.all().order_by('-expense_date')
+    expenditures = Expenditure.objects.all().order_by(*EXPENDITURES_LIST_ORDERING)
 
     # Filter by date range
     start_date = request.GET.get('start_date')
@@ -1434,12 +1400,18 @@ def expenditures_list(request):
     if end_date:
         expenditures = expenditures.filter(expense_date__date__lte=end_date)
 
-    total_spent = expenditures.aggregate(total=Sum('amount'))['total'] or Decimal('0')
+    # The row count rides along with the total so numbered pages skip their own COUNT(*)
+    totals = expenditures.aggregate(total=Sum('amount'), count=Count('id'))
+    total_spent = totals['total'] or Decimal('0')
 
-    # Paginate
-    page = request.GET.get('page')
-    paginator = Paginator(expenditures, 20)
-    page_obj = paginator.get_page(page)
+    # "Next" links carry a keyset cursor (an index seek on expense_date, no OFFSET or
+    # COUNT); numbered page links still work as before
+    paginator = None
+    page_obj = keyset_page(expenditures, EXPENDITURES_LIST_ORDERING, request.GET.get('cursor'), 20)
+    if page_obj is None:
+        paginator = PkSlicePaginator(expenditures, 20, count=totals['count'])
+        page_obj = paginator.get_page(request.GET.get('page'))
+        page_obj.next_cursor = next_cursor_for(page_obj, EXPENDITURES_LIST_ORDERING)
 
     context = {
         'expenditures': page_obj,
@@ -1484,7 +1456,7 @@ def delete_expenditure(request, pk):
 @login_required
 def expenditures_export_csv(request):
     """Export filtered expenditures as CSV"""
-    expenditures = Expenditure.objects.all().order_by('-expense_date')
+    expenditures = Expenditure.objects.all().order_by(*EXPENDITURES_LIST_ORDERING)
     start_date = request.GET.get('start_date')
     end_date = request.GET.get('end_date')
     if start_date in (None, '', 'None'):
@@ -1496,39 +1468,31 @@ def expenditures_export_csv(request):
     if end_date:
         expenditures = expenditures.filter(expense_date__date__lte=end_date)
 
-    try:
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="expenditures.csv"'
-
-        writer = csv.writer(response)
-        writer.writerow(['ID', 'Category', 'Description', 'Date', 'Amount', 'Created By'])
-        for e in expenditures:
-            # ensure we can format fields safely
-            date_str = ''
-            try:
-                date_str = timezone.localtime(e.expense_date).strftime('%Y-%m-%d %H:%M:%S')
-            except Exception:
-                date_str = str(e.expense_date)
-
-            created_by = ''
-            try:
-                created_by = e.created_by.username if e.created_by else ''
-            except Exception:
-                created_by = ''
+    # Only the exported columns, creator's username joined in, read as plain tuples (no
+    # model instances) and streamed in chunks rather than built in memory
+    expenditures = expenditures.values_list(
+        'id', 'category', 'description', 'expense_date', 'amount', 'created_by__username',
+    )
 
-            writer.writerow([
-                e.id,
-                e.get_category_display(),
-                e.description or '',
-                date_str,
-                f"{e.amount}",
-                created_by,
-            ])
-        return response
-    except Exception as exc:
-        # Log and show a friendly message if CSV generation fails in production
-        messages.error(request, 'Failed to export expenditures as CSV. Please try again or contact support.')
-        return redirect('expenditures_list')
+    def rows():
+        # Resolve the display timezone once rather than per row
+        tz = timezone.get_current_timezone()
+        yield ['ID', 'Category', 'Description', 'Date', 'Amount', 'Created By']
+        for pk, category, description, expense_date, amount, username in expenditures.iterator(
+            chunk_size=CSV_EXPORT_CHUNK_SIZE
+        ):
+            yield [
+                pk,
+                _EXPENDITURE_CATEGORY_DISPLAY.get(category, category),
+                description or '',
+                expense_date.astimezone(tz).strftime('%Y-%m-%d %H:%M:%S'),
+                f"{amount}",
+                username or '',
+            ]
+
+    response = StreamingHttpResponse(_csv_chunks(rows()), content_type='text/csv')
+    response['Content-Disposition'] = 'attachment; filename="expenditures.csv"'
+    return response
 
 
 @login_required
@@ -1538,7 +1502,7 @@ def expenditures_export_pdf(request):
         messages.error(request, 'PDF export requires the ReportLab package. Install it with `pip install reportlab`.')
         return redirect('expenditures_list')
 
-    expenditures = Expenditure.objects.all().order_by('-expense_date')
+    expenditures = Expenditure.objects.all().order_by(*EXPENDITURES_LIST_ORDERING)
     start_date = request.GET.get('start_date')
     end_date = request.GET.get('end_date')
     if start_date in (None, '', 'None'):
@@ -1550,58 +1514,57 @@ def expenditures_export_pdf(request):
     if end_date:
         expenditures = expenditures.filter(expense_date__date__lte=end_date)
 
-    buffer = BytesIO()
-    p = canvas.Canvas(buffer, pagesize=A4)
-    width, height = A4
-    margin = 20 * mm
-    y = height - margin
-
-    # Header
-    p.setFont('Helvetica-Bold', 14)
-    p.drawString(margin, y, 'Expenditures Report')
-    y -= 10 * mm
-    p.setFont('Helvetica', 10)
-
-    # Table header
-    p.drawString(margin, y, 'ID')
-    p.drawString(margin + 20 * mm, y, 'Category')
-    p.drawString(margin + 60 * mm, y, 'Date')
-    p.drawString(margin + 100 * mm, y, 'Amount')
-    p.drawString(margin + 130 * mm, y, 'Description')
-    y -= 6 * mm
-
-    for e in expenditures:
-        if y < margin + 20 * mm:
-            p.showPage()
-            y = height - margin
-        date_str = ''
-        try:
-            date_str = timezone.localtime(e.expense_date).strftime('%Y-%m-%d %H:%M')
-        except Exception:
-            date_str = str(e.expense_date)
-
-        p.drawString(margin, y, str(e.id))
-        p.drawString(margin + 20 * mm, y, e.get_category_display())
-        p.drawString(margin + 60 * mm, y, date_str)
-        p.drawString(margin + 100 * mm, y, f"{e.amount}")
-        # description may be long — wrap rudimentarily
-        desc = (e.description or '')[:80]
-        p.drawString(margin + 130 * mm, y, desc)
-        y -= 6 * mm
-
-    p.showPage()
-    p.save()
-    buffer.seek(0)
-    response = HttpResponse(buffer.getvalue(), content_type='application/pdf')
+    tz = timezone.get_current_timezone()
+    # Stream the rows in chunks like the CSV exports rather than caching the whole
+    # queryset, as plain tuples of the printed columns
+    rows = expenditures.values_list('id', 'category', 'description', 'expense_date', 'amount')
+    data = [['ID', 'Category', 'Date', 'Amount', 'Description']]
+    for pk, category, description, expense_date, amount in rows.iterator(chunk_size=CSV_EXPORT_CHUNK_SIZE):
+        data.append([
+            str(pk),
+            _EXPENDITURE_CATEGORY_DISPLAY.get(category, category),
+            expense_date.astimezone(tz).strftime('%Y-%m-%d %H:%M'),
+            f"{amount}",
+            # description may be long — truncate rudimentarily
+            (description or '')[:80],
+        ])
+
+    # LongTable lays out and splits long tables across pages (repeating the header row)
+    # more cheaply than Table, replacing the drawString calls and manual pagination
+    table = LongTable(data, colWidths=_EXPENDITURES_PDF_COL_WIDTHS, repeatRows=1, style=_EXPENDITURES_PDF_TABLE_STYLE)
+
+    # Written straight into the response, as in sales_daily_export_pdf
+    response = HttpResponse(content_type='application/pdf')
     response['Content-Disposition'] = 'attachment; filename="expenditures.pdf"'
+    margin = _EXPENDITURES_PDF_MARGIN
+    doc = SimpleDocTemplate(
+        response, pagesize=A4, title='Expenditures Report',
+        leftMargin=margin, rightMargin=margin, topMargin=margin, bottomMargin=margin,
+    )
+    doc.build([
+        Paragraph('Expenditures Report', _PDF_TITLE_STYLE),
+        Spacer(1, 4 * mm),
+        table,
+    ])
+
     return response
 
 
 @login_required
 def debt_detail(request, pk):
     """Detail view for a debt"""
-    debt = get_object_or_404(Debt, pk=pk)
-    payments = debt.payments.all().order_by('-payment_date')
+    # Only the columns the page shows; the creator join is dropped
+    debt = get_object_or_404(
+        Debt.objects.select_related(None).select_related('customer', 'item', 'sale').only(
+            'created_at', 'quantity', 'amount', 'paid_amount', 'due_date', 'status', 'description',
+            'customer__name', 'customer__phone', 'item__name', 'sale__sale_date', 'sale__total_amount',
+        ),
+        pk=pk,
+    )
+    # The related manager attaches `debt` itself: skip the manager's debt/customer join
+    payments = debt.payments.select_related(None).only(
+        'debt', 'amount', 'payment_date', 'payment_method', 'notes',
+    ).order_by('-payment_date')
     
     context = {
         'debt': debt,
@@ -1618,36 +1581,25 @@ def create_debt(request):
         form = DebtForm(request.POST)
         if form.is_valid():
             debt = form.save(commit=False)
-            # If an item is provided and amount left blank, auto-calc from item price
-            if debt.item and (debt.amount is None or debt.amount == 0):
-                debt.amount = (debt.item.unit_price or Decimal('0.00')) * debt.quantity
-            # If an item is provided and the user entered the item unit price (not the total),
-            # treat it as a per-unit price and multiply by the quantity to store the total debt.
-            elif debt.item and debt.amount is not None:
-                try:
-                    unit_price = (debt.item.unit_price or Decimal('0.00'))
-                    # If the entered amount equals the unit price, assume it's a per-unit value
-                    if debt.amount == unit_price:
-                        debt.amount = debt.amount * debt.quantity
-                except Exception:
-                    # If anything goes wrong with comparison, fall back to using the provided amount
-                    pass
             # record which user created this debt (if available)
             try:
                 debt.created_by = request.user
             except Exception:
                 pass
 
-            # Reduce stock if item provided
-            if debt.item:
-                if debt.item.stock_quantity < debt.quantity:
-                    form.add_error('quantity', 'Insufficient stock to create debt for this quantity.')
-                    return render(request, 'tracker/debt_form.html', {'form': form})
-                else:
-                    # deduct stock
-                    debt.item.stock_quantity -= debt.quantity
-                    debt.item.save(update_fields=['stock_quantity'])
-            debt.save()
+            with transaction.atomic():
+                # Reduce stock if item provided: one conditional UPDATE both checks and
+                # deducts, so concurrent requests can't oversell between a read and a write
+                if debt.item:
+                    updated = StationeryItem.objects.filter(
+                        pk=debt.item_id, stock_quantity__gte=debt.quantity,
+                    ).update(stock_quantity=F('stock_quantity') - debt.quantity)
+                    if not updated:
+                        form.add_error('quantity', 'Insufficient stock to create debt for this quantity.')
+                        return render(request, 'tracker/debt_form.html', {'form': form, 'unit_prices': form.unit_prices})
+                    # update() skips the StationeryItem signals that refresh the stock figures
+                    transaction.on_commit(bump_catalog_version)
+                debt.save()
             messages.success(request, 'Debt created successfully!')
             return redirect('debts_list')
     else:
@@ -1669,36 +1621,41 @@ def add_payment(request, debt_id):
     if request.method == 'POST':
         form = PaymentForm(request.POST, debt=debt)
         if form.is_valid():
-            payment = form.save(commit=False)
-            payment.debt = debt
-            payment.save()
+            # The payment, its sale and the debt link commit together
+            with transaction.atomic():
+                payment = form.save(commit=False)
+                payment.debt = debt
+                payment.save()
 
-            # Create a Sale corresponding to this payment so sales dashboards reflect payments received
-            try:
-                # Create detailed notes showing the debt items and information
-                debt_items_info = f"Debt #{debt.pk}: {debt.item.name}"
-                if debt.quantity > 1:
-                    debt_items_info += f" (Qty: {debt.quantity})"
-                debt_items_info += f" - Total: TZS {debt.amount:,.0f}"
-                if debt.description:
-                    debt_items_info += f" - {debt.description}"
-                
-                sale = Sale.objects.create(
-                    customer=debt.customer,
-                    total_amount=payment.amount,
-                    payment_method=payment.payment_method,
-                    is_paid=True,
-                    notes=f'Payment for {debt_items_info}',
-                    created_by=request.user
-                )
-                # Only link the created sale to the debt if the debt had no originating sale
-                # (we don't want to overwrite an original sale that generated the debt)
-                if not debt.sale:
-                    debt.sale = sale
-                    debt.save(update_fields=['sale'])
-            except Exception:
-                # Don't prevent the payment from being recorded if sale creation fails
-                sale = None
+                # Create a Sale corresponding to this payment so sales dashboards reflect payments received
+                try:
+                    # Create detailed notes showing the debt items and information
+                    debt_items_info = f"Debt #{debt.pk}: {debt.item.name}"
+                    if debt.quantity > 1:
+                        debt_items_info += f" (Qty: {debt.quantity})"
+                    debt_items_info += f" - Total: TZS {debt.amount:,.0f}"
+                    if debt.description:
+                        debt_items_info += f" - {debt.description}"
+
+                    # Savepoint: a failure here rolls back only the sale, not the payment
+                    with transaction.atomic():
+                        sale = Sale.objects.create(
+                            customer=debt.customer,
+                            total_amount=payment.amount,
+                            payment_method=payment.payment_method,
+                            is_paid=True,
+                            notes=f'Payment for {debt_items_info}',
+                            created_by=request.user,
+                            paid_debt=debt,
+                            is_payment=True,
+                        )
+                        # Only link the created sale to the debt if the debt had no originating sale
+                        # (we don't want to overwrite an original sale that generated the debt).
+                        # The condition lives in the UPDATE so a concurrent payment can't race it
+                        Debt.objects.filter(pk=debt.pk, sale__isnull=True).update(sale=sale)
+                except Exception:
+                    # Don't prevent the payment from being recorded if sale creation fails
+                    sale = None
 
             messages.success(request, 'Payment added successfully!')
             return redirect('debt_detail', pk=debt.pk)
@@ -1728,9 +1685,11 @@ def customers_list(request):
             Q(phone__icontains=search_query)
         )
     
-    # Paginate
+    # Paginate. The unfiltered list's row count is cached until a customer changes;
+    # search results are counted per query
+    count = None if search_query else cached_active_customer_count(customers.count)
     page = request.GET.get('page')
-    paginator = Paginator(customers, 20)
+    paginator = PkSlicePaginator(customers, 20, count=count)
     page_obj = paginator.get_page(page)
 
     context = {
@@ -1747,8 +1706,10 @@ def customers_list(request):
 def customer_detail(request, pk):
     """Detail view for a customer"""
     customer = get_object_or_404(Customer, pk=pk)
-    sales = customer.sale_set.all().order_by('-sale_date')[:10]
-    debts = customer.debts.all().order_by('-created_at')
+    # Only the columns the sidebar lists show (plus customer_id, which the related manager
+    # reads back to attach the customer); both walk a (customer, date) index
+    sales = customer.sale_set.select_related(None).only('customer', 'sale_date', 'total_amount').order_by('-sale_date')[:10]
+    debts = customer.debts.select_related(None).only('customer', 'due_date', 'amount', 'paid_amount').order_by('-created_at')
     
     context = {
         'customer': customer,
@@ -1828,7 +1789,7 @@ def send_bulk_debt_sms(request):
     if request.method == 'POST':
         try:
             try:
-                from .sms_utils import send_debt_reminder_sms
+                from .sms_utils import debt_reminder_sms_message, send_bulk_sms
             except Exception as e:
                 logger.exception("Failed to import sms_utils: %s", e)
                 messages.error(request, 'SMS module could not be loaded. Check configuration.')
@@ -1849,28 +1810,39 @@ def send_bulk_debt_sms(request):
                 messages.warning(request, 'No debts selected. Please select at least one debt.')
                 return redirect('send_bulk_debt_sms')
 
-            debts = Debt.objects.select_related('customer').filter(
-                id__in=debt_ids,
-                customer__phone__isnull=False
-            ).exclude(customer__phone='')
+            # Look the selection up in batches so a "select all" on a long list stays under
+            # the database's bound-parameter limit
+            debt_ids = list(dict.fromkeys(debt_ids))
+            batch = settings.BULK_BATCH_SIZE
+            debts = []
+            for i in range(0, len(debt_ids), batch):
+                debts.extend(Debt.objects.select_related('customer').filter(
+                    id__in=debt_ids[i:i + batch],
+                    customer__phone__isnull=False
+                ).exclude(customer__phone=''))
 
             sent_count = 0
             failed_count = 0
             errors = []
 
+            # Build every message up front, then hand them to the SMS API as one batch
+            outgoing = []
             for debt in debts:
                 try:
-                    result = send_debt_reminder_sms(debt)
-                    if result.get('success'):
-                        sent_count += 1
-                    else:
-                        failed_count += 1
-                        errors.append(f"{debt.customer.name}: {result.get('error', 'Unknown error')}")
+                    outgoing.append((debt, debt_reminder_sms_message(debt)))
                 except Exception as e:
                     logger.exception("Bulk SMS failed for debt id=%s: %s", debt.pk, e)
                     failed_count += 1
                     errors.append(f"{debt.customer.name}: {str(e)}")
 
+            results = send_bulk_sms([(debt.customer.phone, message) for debt, message in outgoing])
+            for (debt, _), result in zip(outgoing, results):
+                if result.get('success'):
+                    sent_count += 1
+                else:
+                    failed_count += 1
+                    errors.append(f"{debt.customer.name}: {result.get('error', 'Unknown error')}")
+
             if sent_count > 0:
                 messages.success(request, f'SMS sent to {sent_count} customers')
 